@@ -8,6 +8,15 @@ from starlette.responses import PlainTextResponse, Response, JSONResponse
 from graphql.error import format_error as format_graphql_error
 
 
+def set_operation_path(operations, path: str, value):
+    # Follows a multipart "map" path such as "variables.files.0" and replaces the null placeholder at its end.
+    keys = [int(key) if key.isdigit() else key for key in path.split('.')]
+    target = operations
+    for key in keys[:-1]:
+        target = target[key]
+    target[keys[-1]] = value
+
+
 class CustomGraphqlApp(GraphQLApp):
     async def handle_graphql(self, request: Request) -> Response:
         if request.method in ("GET", "HEAD"):
@@ -34,17 +43,14 @@ class CustomGraphqlApp(GraphQLApp):
                 form: dict = dict(form)
                 data: dict = json.loads(form.pop('operations', None))
                 map_: dict = json.loads(form.pop('map', None))
-                variables: dict = data.get('variables', None)
-                if variables is not None:
-                    for key in variables.keys():
-                        if not bool(variables[key]) or not all(variables[key]):
-                            varValue: list = [
-                                form.get(k, None) for k in map_.keys()
-                            ]
-                            variables[key] = varValue
-                            data.update({
-                                'variables': variables
-                            })
+                try:
+                    for file_key, paths in map_.items():
+                        for path in paths:
+                            set_operation_path(data, path, form.get(file_key, None))
+                except (KeyError, IndexError, TypeError):
+                    return PlainTextResponse(
+                        "Invalid multipart map", status_code=status.HTTP_400_BAD_REQUEST
+                    )
             elif "query" in request.query_params:
                 data = request.query_params
             else:
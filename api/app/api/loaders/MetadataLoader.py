@@ -0,0 +1,70 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from odmantic import AIOEngine, ObjectId
+
+from app.database.database import db
+from app.database.models.Metadata import Metadata
+
+METADATA_LOADER_BATCH_SIZE = 10000
+
+
+class MetadataLoader:
+    def __init__(self, engine: AIOEngine):
+        self.engine = engine
+        self._cache: Dict[Tuple[ObjectId, int], asyncio.Future] = {}
+        self._queue: List[Tuple[ObjectId, int]] = []
+
+    def load(self, project_id: ObjectId, meta_id: int) -> asyncio.Future:
+        key = (project_id, meta_id)
+        future = self._cache.get(key)
+
+        if future is None:
+            loop = asyncio.get_event_loop()
+            future = loop.create_future()
+            self._cache[key] = future
+
+            if len(self._queue) < 1:
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+            self._queue.append(key)
+
+        return future
+
+    async def load_many(self, keys: Iterable[Tuple[ObjectId, int]]) -> List[Optional[Metadata]]:
+        return await asyncio.gather(*[self.load(project_id, meta_id) for project_id, meta_id in keys])
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+
+        meta_ids_by_project = defaultdict(list)
+        for project_id, meta_id in keys:
+            meta_ids_by_project[project_id].append(meta_id)
+
+        try:
+            found = {}
+            for project_id, meta_ids in meta_ids_by_project.items():
+                for start in range(0, len(meta_ids), METADATA_LOADER_BATCH_SIZE):
+                    all_metadata = await self.engine.find(
+                        Metadata,
+                        (Metadata.project == project_id) &
+                        (Metadata.meta_id.in_(meta_ids[start:start + METADATA_LOADER_BATCH_SIZE]))
+                    )
+                    for metadata in all_metadata:
+                        found.setdefault((project_id, metadata.meta_id), metadata)
+        except Exception as error:
+            for key in keys:
+                self._cache.pop(key).set_exception(error)
+            return
+
+        for key in keys:
+            self._cache[key].set_result(found.get(key))
+
+
+def get_metadata_loader(info) -> MetadataLoader:
+    loader = info.context.get('metadata_loader')
+    if loader is None:
+        loader = MetadataLoader(db.engine)
+        info.context['metadata_loader'] = loader
+
+    return loader
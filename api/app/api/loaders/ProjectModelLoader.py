@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, List, Optional
+
+from odmantic import AIOEngine, ObjectId
+
+from app.api.models.ProjectModel import ProjectModel
+from app.database.database import db
+from app.database.models.Project import Project
+from app.database.models.User import User
+
+
+class ProjectModelLoader:
+    def __init__(self, engine: AIOEngine):
+        self.engine = engine
+        self._users: Dict[ObjectId, Optional[User]] = {}
+        self._projects: Dict[ObjectId, ProjectModel] = {}
+
+    async def _load_users(self, user_ids: Iterable[ObjectId]) -> None:
+        missing_ids = list({user_id for user_id in user_ids if user_id not in self._users})
+        if len(missing_ids) < 1:
+            return
+
+        for user_id in missing_ids:
+            self._users[user_id] = None
+        for user in await self.engine.find(User, User.id.in_(missing_ids)):
+            self._users[user.id] = user
+
+    def _build(self, project: Project) -> ProjectModel:
+        real_allowed_users = []
+
+        for user_id in project.allowed_users:
+            db_user = self._users.get(user_id)
+            if db_user is not None and not db_user.deleted:
+                real_allowed_users.append(db_user)
+
+        return ProjectModel(
+            id=project.id,
+            name=project.name,
+            analyzed=project.analyzed,
+            imported=project.imported,
+            importing=project.importing,
+            deleted=project.deleted,
+            files=project.files,
+            allowed_users=real_allowed_users
+        )
+
+    async def load_many(self, projects: Iterable[Project]) -> List[ProjectModel]:
+        projects = list(projects)
+        missing_projects = [project for project in projects if project.id not in self._projects]
+
+        await self._load_users(user_id for project in missing_projects for user_id in project.allowed_users)
+        for project in missing_projects:
+            self._projects[project.id] = self._build(project)
+
+        return [self._projects[project.id] for project in projects]
+
+    async def load(self, project: Project) -> ProjectModel:
+        return (await self.load_many([project]))[0]
+
+
+def get_project_model_loader(info) -> ProjectModelLoader:
+    loader = info.context.get('project_model_loader')
+    if loader is None:
+        loader = ProjectModelLoader(db.engine)
+        info.context['project_model_loader'] = loader
+
+    return loader
@@ -0,0 +1,11 @@
+import graphene
+
+from app.api.models.MetadataModel import MetadataModel
+
+
+class LiveRecommendationModel(graphene.ObjectType):
+    user_id = graphene.Int(required=True)
+    item_id = graphene.Int(required=True)
+    metadata = graphene.Field(MetadataModel, required=False)
+    score = graphene.Float(required=True)
+    user_item_weight = graphene.Int(required=True, default_value=1)
@@ -0,0 +1,24 @@
+import graphene
+
+
+class AnalysisPhaseModel(graphene.ObjectType):
+    name = graphene.String(required=True)
+    duration = graphene.Float(required=True)
+
+
+class ProjectAnalysisStatusModel(graphene.ObjectType):
+    project_id = graphene.ID(required=True)
+    state = graphene.String(required=True)
+    phase = graphene.String(required=False)
+    started_at = graphene.DateTime(required=True)
+    finished_at = graphene.DateTime(required=False)
+    error = graphene.String(required=False)
+    phases = graphene.List(AnalysisPhaseModel, required=True)
+    rows = graphene.Int(required=True)
+    users = graphene.Int(required=True)
+    items = graphene.Int(required=True)
+    interactions = graphene.Int(required=True)
+    scored_users = graphene.Int(required=True)
+    recommendations = graphene.Int(required=True)
+    partitions = graphene.Int(required=True)
+    finished_partitions = graphene.Int(required=True)
@@ -8,6 +8,7 @@ class ProjectModel(graphene.ObjectType):
     id = graphene.ID(required=True)
     name = graphene.String(required=True)
     analyzed = graphene.Boolean(required=True, default_value=False)
+    importing = graphene.Boolean(required=True, default_value=False)
     imported = graphene.Boolean(required=True, default_value=False)
     deleted = graphene.Boolean(required=True, default_value=False)
     files = graphene.List(FileLocationModel, required=True)
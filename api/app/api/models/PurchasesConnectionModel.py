@@ -0,0 +1,8 @@
+from graphene import relay
+
+from app.api.models.PurchaseModel import PurchaseModel
+
+
+class PurchasesConnectionModel(relay.Connection):
+    class Meta:
+        node = PurchaseModel
@@ -0,0 +1,8 @@
+from graphene import relay
+
+from app.api.models.RecommendationModel import RecommendationModel
+
+
+class RecommendationsConnectionModel(relay.Connection):
+    class Meta:
+        node = RecommendationModel
@@ -0,0 +1,9 @@
+import graphene
+
+from app.api.models.MetadataModel import MetadataModel
+
+
+class SimilarItemModel(graphene.ObjectType):
+    item_id = graphene.Int(required=True)
+    metadata = graphene.Field(MetadataModel, required=False)
+    score = graphene.Float(required=True)
@@ -1,8 +1,5 @@
 from pathlib import Path
 
-import numpy
-import pandas as pd
-import numpy as np
 import graphene
 from graphene_file_upload.scalars import Upload
 from graphql import GraphQLError
@@ -12,14 +9,18 @@ from odmantic import ObjectId
 from app.api.decorators.AuthDecorators import access_level_required, gql_full_jwt_required
 from app.api.models.ProjectModel import ProjectModel
 from app.api.mutations.types.ProjectMetadataInput import ProjectMetadataInput
+from app.api.mutations.types.WeightingSchemeInput import WeightingSchemeInput
 from app.api.status_codes import STATUS_CODE
 from app.api.utils.AuthUtils import DEFAULT_USER_PLUS_ACCESS_LEVEL
-from app.celery.celery_worker import analyze_purchases, import_and_analyze_purchases
+from app.celery.celery_worker import analyze_purchases, import_project_files
+from app.celery.training import is_valid_training_parameters
+from app.celery.weighting import is_valid_weighting
 from app.database.database import db
 from app.database.models.FileLocation import FileLocation
-from app.database.models.Metadata import Metadata
 from app.database.models.Project import Project
+from app.database.models.TrainingParameters import TrainingParameters
 from app.database.models.User import User
+from app.database.models.WeightingScheme import WeightingScheme
 from app.settings import UPLOAD_FILE_PATH
 from app.api.utils.FileUtils import save_uploaded_file
 
@@ -37,15 +38,27 @@ class CreateProject(graphene.Mutation):
         files = graphene.List(Upload, required=True)
         project_name = graphene.String(required=True)
         project_metadata = ProjectMetadataInput(required=True)
+        weighting = WeightingSchemeInput(required=False)
 
     project = graphene.Field(ProjectModel)
 
     @staticmethod
     @access_level_required(DEFAULT_USER_PLUS_ACCESS_LEVEL.level, False)
-    async def mutate(root, info, files=None, project_name=None, project_metadata=None, **kwargs):
+    async def mutate(root, info, files=None, project_name=None, project_metadata=None, weighting=None, **kwargs):
         if project_name is None or (files is None or len(files) < 1) or project_metadata is None:
             raise GraphQLError(STATUS_CODE[50], extensions={'code': 50})
 
+        weighting_scheme = WeightingScheme(**weighting) if weighting is not None else None
+
+        if weighting_scheme is not None and not is_valid_weighting(weighting_scheme):
+            raise GraphQLError(STATUS_CODE[211], extensions={'code': 211})
+
+        training_parameters = TrainingParameters(**project_metadata['training']) \
+            if project_metadata.get('training') is not None else None
+
+        if training_parameters is not None and not is_valid_training_parameters(training_parameters):
+            raise GraphQLError(STATUS_CODE[215], extensions={'code': 215})
+
         project = await db.engine.find_one(Project, Project.name == project_name)
 
         if project is not None and not project.deleted:
@@ -66,10 +79,11 @@ class CreateProject(graphene.Mutation):
 
         project_template = Project(
             name=str(project_name),
-            files=project_files
+            files=project_files,
+            weighting=weighting_scheme,
+            training=training_parameters
         )
 
-        dataset = []
         for file in files:
             new_file_path = Path(str(upload_path) + '/' + file.filename)
 
@@ -78,84 +92,26 @@ class CreateProject(graphene.Mutation):
                 (FileLocation.name == file.filename) & (FileLocation.location == str(new_file_path))
             )
 
+            content_hash, size = None, None
             try:
-                await save_uploaded_file(file, new_file_path)
+                content_hash, size = await save_uploaded_file(file, new_file_path)
             finally:
                 if not db_file_location:
                     project_file = FileLocation(
                         name=file.filename,
                         location=str(new_file_path),
                         file_type='metadata' if file.filename == project_metadata['meta_file_name'] else 'subscriptions',
+                        content_hash=content_hash,
+                        size=size
                     )
                     await db.engine.save(project_file)
                     project_files.append(project_file)
                 else:
+                    db_file_location.content_hash = content_hash
+                    db_file_location.size = size
+                    await db.engine.save(db_file_location)
                     project_files.append(db_file_location)
 
-            chunk_size = 10 ** 6
-            with pd.read_csv(str(new_file_path), chunksize=chunk_size, encoding='utf8') as reader:
-                for chunk in reader:
-                    if file.filename == project_metadata['meta_file_name']:
-                        if project_metadata['meta_name_header'] is None:
-                            values = chunk[
-                                project_metadata['meta_id_header']
-                            ].to_numpy()
-                        else:
-                            values = chunk[[
-                                project_metadata['meta_id_header'],
-                                project_metadata['meta_name_header']
-                            ]].to_numpy()
-
-                        for value in values:
-                            if project_metadata['meta_name_header'] is None:
-                                metadata_exists = await db.engine.find_one(
-                                    Metadata,
-                                    (
-                                        (Metadata.project == project_template.id) &
-                                        (Metadata.meta_id == value[0])
-                                    )
-                                )
-                            else:
-                                metadata_exists = await db.engine.find_one(
-                                    Metadata,
-                                    (
-                                        (Metadata.project == project_template.id) &
-                                        (Metadata.meta_id == value[0]) &
-                                        (Metadata.name == value[1])
-                                    )
-                                )
-                            if metadata_exists is None:
-                                if project_metadata['meta_name_header'] is None:
-                                    metadata = Metadata(
-                                        meta_id=value[0],
-                                        project=project_template
-                                    )
-                                else:
-                                    metadata = Metadata(
-                                        meta_id=value[0],
-                                        name=value[1],
-                                        project=project_template
-                                    )
-                                await db.engine.save(metadata)
-                    elif file.filename == project_metadata['subscriptions_file_name']:
-                        purchases_with_dates = numpy.sort(
-                            chunk[[
-                                project_metadata['subscriptions_user_id_header'],
-                                project_metadata['subscriptions_meta_id_header'],
-                                project_metadata['subscriptions_start_from_header'],
-                                project_metadata['subscriptions_end_at_header'],
-                            ]].to_numpy(),
-                            axis=0
-                        )
-                        purchases = chunk[[
-                            project_metadata['subscriptions_user_id_header'],
-                            project_metadata['subscriptions_meta_id_header'],
-                        ]].to_numpy()
-
-                        unq_values, cnt = np.unique(purchases, axis=0, return_counts=True)
-
-                        dataset = [[unq_values.tolist(), cnt.tolist()], purchases_with_dates.tolist()]
-
         project_template.files = project_files
 
         if not token_claims['access_level']['is_staff']:
@@ -163,17 +119,14 @@ class CreateProject(graphene.Mutation):
             if current_user is not None and not current_user.deleted:
                 project_template.allowed_users = [current_user.id]
 
-        if dataset is not None and len(dataset) > 0:
-            import_and_analyze_purchases.apply_async(args=[
-                dumps(project_template.doc()),
-                dataset,
-                project_metadata,
-                True,
-                True
-            ], max_retries=3, retry=True)
-
+        project_template.importing = True
         created_project = await db.engine.save(project_template)
 
+        import_project_files.apply_async(args=[
+            dumps(created_project.doc()),
+            project_metadata
+        ], max_retries=3, retry=True)
+
         allowed_users = await db.engine.find(User, User.id.in_(created_project.allowed_users))
         real_allowed_users = []
 
@@ -185,6 +138,7 @@ class CreateProject(graphene.Mutation):
             id=created_project.id,
             name=created_project.name,
             analyzed=False,
+            importing=created_project.importing,
             imported=False,
             deleted=created_project.deleted,
             files=created_project.files,
@@ -198,18 +152,41 @@ class ReAnalyze(graphene.Mutation):
     class Arguments:
         project_id = graphene.String(required=True)
         project_metadata = ProjectMetadataInput(required=True)
+        weighting = WeightingSchemeInput(required=False)
+        subscriptions_file = Upload(required=False)
+        incremental = graphene.Boolean(required=False, default_value=False)
 
     message = graphene.String()
 
     @staticmethod
     @gql_full_jwt_required
-    async def mutate(root, info, project_id=None, project_metadata=None, **kwargs):
+    async def mutate(
+            root,
+            info,
+            project_id=None,
+            project_metadata=None,
+            weighting=None,
+            subscriptions_file=None,
+            incremental=False,
+            **kwargs
+    ):
         if project_id is None:
             raise GraphQLError(STATUS_CODE[50], extensions={'code': 50})
 
         if not ObjectId.is_valid(project_id):
             raise GraphQLError(STATUS_CODE[53], extensions={'code': 53})
 
+        weighting_scheme = WeightingScheme(**weighting) if weighting is not None else None
+
+        if weighting_scheme is not None and not is_valid_weighting(weighting_scheme):
+            raise GraphQLError(STATUS_CODE[211], extensions={'code': 211})
+
+        training_parameters = TrainingParameters(**project_metadata['training']) \
+            if project_metadata.get('training') is not None else None
+
+        if training_parameters is not None and not is_valid_training_parameters(training_parameters):
+            raise GraphQLError(STATUS_CODE[215], extensions={'code': 215})
+
         project = await db.engine.find_one(Project, Project.id == ObjectId(project_id))
 
         if project is None or project.deleted:
@@ -239,14 +216,40 @@ class ReAnalyze(graphene.Mutation):
         if request_user_id not in real_allowed_users and not is_admin:
             raise GraphQLError(STATUS_CODE[51], extensions={'code': 51})
 
+        if subscriptions_file is not None:
+            subscriptions_file_info = next(
+                (project_file for project_file in project.files if project_file.file_type == 'subscriptions'),
+                None
+            )
+
+            if subscriptions_file_info is None:
+                raise GraphQLError(STATUS_CODE[206], extensions={'code': 206})
+
+            content_hash, size = await save_uploaded_file(subscriptions_file, Path(subscriptions_file_info.location))
+            subscriptions_file_info.content_hash = content_hash
+            subscriptions_file_info.size = size
+
+            db_file_location = await db.engine.find_one(FileLocation, FileLocation.id == subscriptions_file_info.id)
+            if db_file_location is not None:
+                db_file_location.content_hash = content_hash
+                db_file_location.size = size
+                await db.engine.save(db_file_location)
+
         project.analyzed = False
+        if weighting_scheme is not None:
+            project.weighting = weighting_scheme
+        if training_parameters is not None:
+            project.training = training_parameters
         await db.engine.save(project)
-        await db.raw_engine['recommendations'].delete_many({'project': ObjectId(project_id)})
+
+        if not incremental:
+            await db.raw_engine['recommendations'].delete_many({'project': ObjectId(project_id)})
 
         analyze_purchases.apply_async(args=[
             dumps(project.doc()),
             project_metadata,
-            True
+            True,
+            incremental
         ], priority=9, max_retries=3, retry=True)
 
         return ReAnalyze(message='Task Started')
@@ -1,5 +1,7 @@
 import graphene
 
+from app.api.mutations.types.TrainingParametersInput import TrainingParametersInput
+
 
 class ProjectMetadataInput(graphene.InputObjectType):
     meta_file_name = graphene.String(required=True)
@@ -10,3 +12,4 @@ class ProjectMetadataInput(graphene.InputObjectType):
     subscriptions_user_id_header = graphene.String(required=True)
     subscriptions_start_from_header = graphene.String(required=True)
     subscriptions_end_at_header = graphene.String(required=True)
+    training = TrainingParametersInput(required=False)
@@ -0,0 +1,9 @@
+import graphene
+
+
+class TrainingParametersInput(graphene.InputObjectType):
+    factors = graphene.Int(required=False, default_value=140)
+    regularization = graphene.Float(required=False, default_value=0.1)
+    iterations = graphene.Int(required=False, default_value=40)
+    warm_start = graphene.Boolean(required=False, default_value=False)
+    warm_start_iterations = graphene.Int(required=False, default_value=10)
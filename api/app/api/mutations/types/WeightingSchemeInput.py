@@ -0,0 +1,10 @@
+import graphene
+
+
+class WeightingSchemeInput(graphene.InputObjectType):
+    scheme = graphene.String(required=False, default_value='bucketed')
+    alpha = graphene.Float(required=False, default_value=40.0)
+    bins = graphene.List(graphene.Float, required=False, default_value=[2, 5, 10, 20])
+    epsilon = graphene.Float(required=False, default_value=1.0)
+    k1 = graphene.Float(required=False, default_value=100.0)
+    b = graphene.Float(required=False, default_value=0.8)
@@ -5,25 +5,41 @@ import graphene
 from graphene import relay
 from graphql import GraphQLError
 from odmantic import ObjectId, query
+from starlette.concurrency import run_in_threadpool
 
 from app.api.decorators.AuthDecorators import gql_full_jwt_required, access_level_required
+from app.api.loaders.MetadataLoader import get_metadata_loader
+from app.api.loaders.ProjectModelLoader import get_project_model_loader
 from app.api.models.AccessLevelModel import AccessLevelModel
 from app.api.models.FileLocationModel import FileLocationModel
+from app.api.models.LiveRecommendationModel import LiveRecommendationModel
 from app.api.models.MetadataModel import MetadataModel
+from app.api.models.ProjectAnalysisStatusModel import ProjectAnalysisStatusModel, AnalysisPhaseModel
 from app.api.models.ProjectModel import ProjectModel
 from app.api.models.ProjectStatisticsModel import ProjectStatisticsModel, ProjectInnerStatisticModel
 from app.api.models.PurchaseModel import PurchaseModel
+from app.api.models.PurchasesConnectionModel import PurchasesConnectionModel
 from app.api.models.PurchasesPaginationModel import PurchasesPaginationModel
 from app.api.models.RecommendationModel import RecommendationModel
+from app.api.models.RecommendationsConnectionModel import RecommendationsConnectionModel
 from app.api.models.RecommendationsPaginationModel import RecommendationsPaginationModel
+from app.api.models.SimilarItemModel import SimilarItemModel
 from app.api.models.UserModel import UserModel
 from app.api.mutations.ProjectMutations import CreateProject, ReAnalyze, UpdateProjectAllowedUsers, DeleteProject, \
     UpdateProjectName
 from app.api.mutations.UserMutations import Login, Register, Refresh, RemoveUser
 from app.api.status_codes import STATUS_CODE
 from app.api.utils.AuthUtils import DEFAULT_ADMIN_ACCESS_LEVEL
+from app.api.utils.CursorUtils import find_keyset_page, encode_cursor, parse_order_by, InvalidCursor, \
+    purchases_filter, recommendations_filter, CONNECTION_DEFAULT_PAGE_SIZE, CONNECTION_MAX_PAGE_SIZE, \
+    PURCHASES_SORT_FIELDS, RECOMMENDATIONS_SORT_FIELDS
+from app.api.utils.RecommendationUtils import factors_cache, recommend_for_user, LIVE_RECOMMENDATIONS_MAX_N
+from app.api.utils.SimilarityUtils import similar_items, SIMILAR_ITEMS_MAX_N
+from app.api.utils.StatisticsUtils import star_histogram, STAR_RATINGS
+from app.celery.scoring import get_user_item_weights
 from app.database.database import db
 from app.database.models.AccessLevel import AccessLevel
+from app.database.models.AnalysisStatus import AnalysisStatus
 from app.database.models.Metadata import Metadata
 from app.database.models.Project import Project
 from app.database.models.Purchase import Purchase
@@ -78,6 +94,38 @@ class ApiQuery(graphene.ObjectType):
         search=graphene.Float(required=False),
         order_by=graphene.String(required=False)
     )
+    project_purchases_connection = graphene.Field(
+        PurchasesConnectionModel,
+        project_id=graphene.String(required=True),
+        first=graphene.Int(required=False, default_value=CONNECTION_DEFAULT_PAGE_SIZE),
+        after=graphene.String(required=False),
+        search=graphene.Float(required=False),
+        order_by=graphene.String(required=False)
+    )
+    project_recommendations_connection = graphene.Field(
+        RecommendationsConnectionModel,
+        project_id=graphene.String(required=True),
+        item_id=graphene.String(required=True, default_value='all'),
+        stars=graphene.Int(required=False, default_value=None),
+        first=graphene.Int(required=False, default_value=CONNECTION_DEFAULT_PAGE_SIZE),
+        after=graphene.String(required=False),
+        search=graphene.Float(required=False),
+        order_by=graphene.String(required=False)
+    )
+    live_user_recommendations = graphene.List(
+        LiveRecommendationModel,
+        project_id=graphene.String(required=True),
+        user_id=graphene.Int(required=True),
+        n=graphene.Int(required=False, default_value=10),
+        offset=graphene.Int(required=False, default_value=0),
+        exclude=graphene.List(graphene.Int, required=False, default_value=None)
+    )
+    similar_items = graphene.List(
+        SimilarItemModel,
+        project_id=graphene.String(required=True),
+        item_id=graphene.Int(required=True),
+        n=graphene.Int(required=False, default_value=10)
+    )
     user_purchases = graphene.List(
         PurchaseModel,
         project_id=graphene.String(required=True),
@@ -88,6 +136,10 @@ class ApiQuery(graphene.ObjectType):
         project_id=graphene.String(required=True),
         item_id=graphene.Int(required=False, default_value=None),
     )
+    project_analysis_status = graphene.Field(
+        ProjectAnalysisStatusModel,
+        project_id=graphene.String(required=True)
+    )
     all_metadata = graphene.List(MetadataModel, project_id=graphene.String(required=True))
     access_levels = graphene.List(AccessLevelModel)
 
@@ -152,25 +204,9 @@ class ApiQuery(graphene.ObjectType):
 
         for project in projects:
             if (ObjectId(claims['user_id']) in project.allowed_users) or is_admin and not project.deleted:
-                allowed_users = await db.engine.find(User, User.id.in_(project.allowed_users))
-                real_allowed_users = []
-
-                for db_user in allowed_users:
-                    if db_user is not None and not db_user.deleted:
-                        real_allowed_users.append(db_user)
-
-                new_project = ProjectModel(
-                    id=project.id,
-                    name=project.name,
-                    analyzed=project.analyzed,
-                    imported=project.imported,
-                    deleted=project.deleted,
-                    files=project.files,
-                    allowed_users=real_allowed_users
-                )
-                allowed_projects.append(new_project)
+                allowed_projects.append(project)
 
-        return allowed_projects
+        return await get_project_model_loader(info).load_many(allowed_projects)
 
     @staticmethod
     @gql_full_jwt_required
@@ -195,22 +231,7 @@ class ApiQuery(graphene.ObjectType):
         if ObjectId(claims['user_id']) not in project.allowed_users and not is_admin:
             raise GraphQLError(STATUS_CODE[51], extensions={'code': 51})
 
-        allowed_users = await db.engine.find(User, User.id.in_(project.allowed_users))
-        real_allowed_users = []
-
-        for db_user in allowed_users:
-            if db_user is not None and not db_user.deleted:
-                real_allowed_users.append(db_user)
-
-        new_project = ProjectModel(
-            id=project.id,
-            name=project.name,
-            analyzed=project.analyzed,
-            imported=project.imported,
-            deleted=project.deleted,
-            files=project.files,
-            allowed_users=real_allowed_users
-        )
+        new_project = await get_project_model_loader(info).load(project)
 
         return new_project
 
@@ -307,39 +328,21 @@ class ApiQuery(graphene.ObjectType):
             )
 
         purchases_with_users = []
+        all_metadata = await get_metadata_loader(info).load_many(
+            (purchase.project.id, purchase.purchase_id) for purchase in purchases
+        )
 
-        for purchase in purchases:
+        for purchase, metadata in zip(purchases, all_metadata):
             project = purchase.project
 
             if project is None or project.deleted:
                 raise GraphQLError(STATUS_CODE[203], extensions={'code': 203})
 
-            allowed_users = await db.engine.find(User, User.id.in_(project.allowed_users))
-            real_allowed_users = []
-
-            for db_user in allowed_users:
-                if db_user is not None and not db_user.deleted:
-                    real_allowed_users.append(db_user)
-
-            project_with_users = ProjectModel(
-                id=project.id,
-                name=project.name,
-                analyzed=project.analyzed,
-                imported=project.imported,
-                deleted=project.deleted,
-                files=project.files,
-                allowed_users=real_allowed_users
-            )
+            project_with_users = await get_project_model_loader(info).load(project)
             new_purchase = PurchaseModel(
                 id=purchase.id,
                 user_id=purchase.user_id,
-                metadata=await db.engine.find_one(
-                    Metadata,
-                    (
-                            (Metadata.project == project_with_users.id) &
-                            (Metadata.meta_id == purchase.purchase_id)
-                    )
-                ),
+                metadata=metadata,
                 weight=purchase.weight,
                 project=project_with_users,
             )
@@ -612,39 +615,21 @@ class ApiQuery(graphene.ObjectType):
                     )
 
         recommendations_with_users = []
+        all_metadata = await get_metadata_loader(info).load_many(
+            (recommendation.project.id, recommendation.item_id) for recommendation in recommendations
+        )
 
-        for recommendation in recommendations:
+        for recommendation, metadata in zip(recommendations, all_metadata):
             project = recommendation.project
 
             if project is None or project.deleted:
                 raise GraphQLError(STATUS_CODE[203], extensions={'code': 203})
 
-            allowed_users = await db.engine.find(User, User.id.in_(project.allowed_users))
-            real_allowed_users = []
-
-            for db_user in allowed_users:
-                if db_user is not None and not db_user.deleted:
-                    real_allowed_users.append(db_user)
-
-            project_with_users = ProjectModel(
-                id=project.id,
-                name=project.name,
-                analyzed=project.analyzed,
-                imported=project.imported,
-                deleted=project.deleted,
-                files=project.files,
-                allowed_users=real_allowed_users
-            )
+            project_with_users = await get_project_model_loader(info).load(project)
             new_recommendation = RecommendationModel(
                 id=recommendation.id,
                 user_id=recommendation.user_id,
-                metadata=await db.engine.find_one(
-                    Metadata,
-                    (
-                            (Metadata.project == project_with_users.id) &
-                            (Metadata.meta_id == recommendation.item_id)
-                    )
-                ),
+                metadata=metadata,
                 user_item_weight=recommendation.user_item_weight,
                 score=recommendation.score,
                 project=project_with_users,
@@ -660,6 +645,182 @@ class ApiQuery(graphene.ObjectType):
             shown_entries=shown_entries
         )
 
+    @staticmethod
+    @gql_full_jwt_required
+    async def resolve_project_purchases_connection(self, info, **kwargs):
+        claims = kwargs['jwt_claims']
+        is_admin = claims['access_level']['is_staff'] if claims is not None else False
+        project_id = kwargs.get('project_id', None)
+        first = kwargs.get('first', CONNECTION_DEFAULT_PAGE_SIZE)
+        after = kwargs.get('after', None)
+        search = kwargs.get('search', None)
+        order_by = kwargs.get('order_by', None)
+
+        if project_id is None:
+            raise GraphQLError(STATUS_CODE[50], extensions={'code': 50})
+
+        if not ObjectId.is_valid(project_id):
+            raise GraphQLError(STATUS_CODE[53], extensions={'code': 53})
+
+        if first < 1 or first > CONNECTION_MAX_PAGE_SIZE:
+            raise GraphQLError(STATUS_CODE[218], extensions={'code': 218})
+
+        user = await db.engine.find_one(User, User.id == ObjectId(claims['user_id']))
+
+        if user is None or user.deleted:
+            raise GraphQLError(STATUS_CODE[107], extensions={'code': 107})
+
+        project = await db.engine.find_one(Project, Project.id == ObjectId(project_id))
+
+        if project is None or project.deleted:
+            raise GraphQLError(STATUS_CODE[201], extensions={'code': 201})
+
+        if not is_admin and not (ObjectId(claims['user_id']) in project.allowed_users):
+            raise GraphQLError(STATUS_CODE[51], extensions={'code': 51})
+
+        base_filter = purchases_filter(project.id, search)
+
+        sort_field, direction = parse_order_by(order_by, PURCHASES_SORT_FIELDS, '-userId')
+
+        try:
+            documents, has_next_page = await find_keyset_page(
+                db.engine.get_collection(Purchase),
+                base_filter,
+                sort_field,
+                direction,
+                first,
+                after
+            )
+        except InvalidCursor:
+            raise GraphQLError(STATUS_CODE[219], extensions={'code': 219})
+
+        purchases = [Purchase.parse_doc(dict(document, project=project.doc())) for document in documents]
+        project_with_users = await get_project_model_loader(info).load(project)
+        all_metadata = await get_metadata_loader(info).load_many(
+            (project.id, purchase.purchase_id) for purchase in purchases
+        )
+
+        edges = [
+            PurchasesConnectionModel.Edge(
+                node=PurchaseModel(
+                    id=purchase.id,
+                    user_id=purchase.user_id,
+                    metadata=metadata,
+                    weight=purchase.weight,
+                    project=project_with_users,
+                ),
+                cursor=encode_cursor(sort_field, document[sort_field], purchase.id)
+            )
+            for purchase, document, metadata in zip(purchases, documents, all_metadata)
+        ]
+
+        return PurchasesConnectionModel(
+            edges=edges,
+            page_info=relay.PageInfo(
+                has_next_page=has_next_page,
+                has_previous_page=after is not None,
+                start_cursor=edges[0].cursor if len(edges) > 0 else None,
+                end_cursor=edges[-1].cursor if len(edges) > 0 else None
+            )
+        )
+
+    @staticmethod
+    @gql_full_jwt_required
+    async def resolve_project_recommendations_connection(self, info, **kwargs):
+        claims = kwargs['jwt_claims']
+        is_admin = claims['access_level']['is_staff'] if claims is not None else False
+        project_id = kwargs.get('project_id', None)
+        first = kwargs.get('first', CONNECTION_DEFAULT_PAGE_SIZE)
+        after = kwargs.get('after', None)
+        search = kwargs.get('search', None)
+        order_by = kwargs.get('order_by', None)
+        item_id = kwargs.get('item_id', 'all')
+        stars = kwargs.get('stars', None)
+
+        if project_id is None:
+            raise GraphQLError(STATUS_CODE[50], extensions={'code': 50})
+
+        if not ObjectId.is_valid(project_id):
+            raise GraphQLError(STATUS_CODE[53], extensions={'code': 53})
+
+        if item_id is None or (item_id != 'all' and not ObjectId.is_valid(item_id)):
+            raise GraphQLError(STATUS_CODE[209], extensions={'code': 209})
+
+        if first < 1 or first > CONNECTION_MAX_PAGE_SIZE:
+            raise GraphQLError(STATUS_CODE[218], extensions={'code': 218})
+
+        project = await db.engine.find_one(Project, Project.id == ObjectId(project_id))
+
+        item = None
+        if item_id != 'all':
+            item = await db.engine.find_one(Metadata, Metadata.id == ObjectId(item_id))
+
+        if project is None or project.deleted:
+            raise GraphQLError(STATUS_CODE[201], extensions={'code': 201})
+
+        user = await db.engine.find_one(User, User.id == ObjectId(claims['user_id']))
+
+        if user is None or user.deleted:
+            raise GraphQLError(STATUS_CODE[107], extensions={'code': 107})
+
+        if item_id != 'all' and item is None:
+            raise GraphQLError(STATUS_CODE[207], extensions={'code': 207})
+
+        if stars is not None and (stars < 1 or stars > 5):
+            raise GraphQLError(STATUS_CODE[210], extensions={'code': 210})
+
+        if not is_admin and not (ObjectId(claims['user_id']) in project.allowed_users):
+            raise GraphQLError(STATUS_CODE[51], extensions={'code': 51})
+
+        base_filter = recommendations_filter(project.id, item.meta_id if item is not None else None, stars, search)
+
+        sort_field, direction = parse_order_by(order_by, RECOMMENDATIONS_SORT_FIELDS, '-userId')
+
+        try:
+            documents, has_next_page = await find_keyset_page(
+                db.engine.get_collection(Recommendation),
+                base_filter,
+                sort_field,
+                direction,
+                first,
+                after
+            )
+        except InvalidCursor:
+            raise GraphQLError(STATUS_CODE[219], extensions={'code': 219})
+
+        recommendations = [
+            Recommendation.parse_doc(dict(document, project=project.doc())) for document in documents
+        ]
+        project_with_users = await get_project_model_loader(info).load(project)
+        all_metadata = await get_metadata_loader(info).load_many(
+            (project.id, recommendation.item_id) for recommendation in recommendations
+        )
+
+        edges = [
+            RecommendationsConnectionModel.Edge(
+                node=RecommendationModel(
+                    id=recommendation.id,
+                    user_id=recommendation.user_id,
+                    metadata=metadata,
+                    user_item_weight=recommendation.user_item_weight,
+                    score=recommendation.score,
+                    project=project_with_users,
+                ),
+                cursor=encode_cursor(sort_field, document[sort_field], recommendation.id)
+            )
+            for recommendation, document, metadata in zip(recommendations, documents, all_metadata)
+        ]
+
+        return RecommendationsConnectionModel(
+            edges=edges,
+            page_info=relay.PageInfo(
+                has_next_page=has_next_page,
+                has_previous_page=after is not None,
+                start_cursor=edges[0].cursor if len(edges) > 0 else None,
+                end_cursor=edges[-1].cursor if len(edges) > 0 else None
+            )
+        )
+
     @staticmethod
     @gql_full_jwt_required
     async def resolve_user_recommendations(self, info, **kwargs):
@@ -702,34 +863,17 @@ class ApiQuery(graphene.ObjectType):
             sort=query.desc(Recommendation.score)
         )
 
-        for recommendation in db_recommendations:
-            allowed_users = await db.engine.find(User, User.id.in_(recommendation.project.allowed_users))
-            real_allowed_users = []
-
-            for db_user in allowed_users:
-                if db_user is not None and not db_user.deleted:
-                    real_allowed_users.append(db_user)
-
-            project_with_allowed_users = ProjectModel(
-                id=recommendation.project.id,
-                name=recommendation.project.name,
-                analyzed=recommendation.project.analyzed,
-                imported=recommendation.project.imported,
-                deleted=recommendation.project.deleted,
-                files=recommendation.project.files,
-                allowed_users=real_allowed_users
-            )
+        all_metadata = await get_metadata_loader(info).load_many(
+            (recommendation.project.id, recommendation.item_id) for recommendation in db_recommendations
+        )
+
+        for recommendation, metadata in zip(db_recommendations, all_metadata):
+            project_with_allowed_users = await get_project_model_loader(info).load(recommendation.project)
 
             recommendations.append(
                 RecommendationModel(
                     id=recommendation.id,
-                    metadata=await db.engine.find_one(
-                        Metadata,
-                        (
-                            (Metadata.project == project_with_allowed_users.id) &
-                            (Metadata.meta_id == recommendation.item_id)
-                        )
-                    ),
+                    metadata=metadata,
                     user_id=recommendation.user_id,
                     score=recommendation.score,
                     user_item_weight=recommendation.user_item_weight,
@@ -739,6 +883,132 @@ class ApiQuery(graphene.ObjectType):
 
         return recommendations
 
+    @staticmethod
+    @gql_full_jwt_required
+    async def resolve_live_user_recommendations(self, info, **kwargs):
+        claims = kwargs['jwt_claims']
+        is_admin = claims['access_level']['is_staff'] if claims is not None else False
+        project_id = kwargs.get('project_id', None)
+        user_id = kwargs.get('user_id', None)
+        n = kwargs.get('n', 10)
+        offset = kwargs.get('offset', 0)
+        exclude = kwargs.get('exclude', None)
+
+        if user_id is None or project_id is None:
+            raise GraphQLError(STATUS_CODE[50], extensions={'code': 50})
+
+        if not ObjectId.is_valid(project_id):
+            raise GraphQLError(STATUS_CODE[53], extensions={'code': 53})
+
+        if n < 1 or n > LIVE_RECOMMENDATIONS_MAX_N or offset < 0:
+            raise GraphQLError(STATUS_CODE[214], extensions={'code': 214})
+
+        project = await db.engine.find_one(Project, Project.id == ObjectId(project_id))
+
+        if project is None or project.deleted:
+            raise GraphQLError(STATUS_CODE[201], extensions={'code': 201})
+
+        user = await db.engine.find_one(User, User.id == ObjectId(claims['user_id']))
+
+        if user is None or user.deleted:
+            raise GraphQLError(STATUS_CODE[107], extensions={'code': 107})
+
+        if not is_admin and not (ObjectId(claims['user_id']) in project.allowed_users):
+            raise GraphQLError(STATUS_CODE[51], extensions={'code': 51})
+
+        factors = await run_in_threadpool(factors_cache.get, project.id)
+
+        if factors is None:
+            raise GraphQLError(STATUS_CODE[212], extensions={'code': 212})
+
+        recommended = await run_in_threadpool(recommend_for_user, factors, user_id, n, offset, exclude)
+
+        if recommended is None:
+            raise GraphQLError(STATUS_CODE[213], extensions={'code': 213})
+
+        item_ids, scores = recommended
+        item_ids = item_ids.tolist()
+
+        all_metadata = await db.engine.find(
+            Metadata,
+            (Metadata.project == project.id) & (Metadata.meta_id.in_(item_ids))
+        )
+        metadata_by_id = {metadata.meta_id: metadata for metadata in all_metadata}
+
+        return [
+            LiveRecommendationModel(
+                user_id=user_id,
+                item_id=item_id,
+                metadata=metadata_by_id.get(item_id),
+                score=score,
+                user_item_weight=user_item_weight
+            )
+            for item_id, score, user_item_weight in zip(
+                item_ids,
+                scores.tolist(),
+                get_user_item_weights(scores).tolist()
+            )
+        ]
+
+    @staticmethod
+    @gql_full_jwt_required
+    async def resolve_similar_items(self, info, **kwargs):
+        claims = kwargs['jwt_claims']
+        is_admin = claims['access_level']['is_staff'] if claims is not None else False
+        project_id = kwargs.get('project_id', None)
+        item_id = kwargs.get('item_id', None)
+        n = kwargs.get('n', 10)
+
+        if item_id is None or project_id is None:
+            raise GraphQLError(STATUS_CODE[50], extensions={'code': 50})
+
+        if not ObjectId.is_valid(project_id):
+            raise GraphQLError(STATUS_CODE[53], extensions={'code': 53})
+
+        if n < 1 or n > SIMILAR_ITEMS_MAX_N:
+            raise GraphQLError(STATUS_CODE[214], extensions={'code': 214})
+
+        project = await db.engine.find_one(Project, Project.id == ObjectId(project_id))
+
+        if project is None or project.deleted:
+            raise GraphQLError(STATUS_CODE[201], extensions={'code': 201})
+
+        user = await db.engine.find_one(User, User.id == ObjectId(claims['user_id']))
+
+        if user is None or user.deleted:
+            raise GraphQLError(STATUS_CODE[107], extensions={'code': 107})
+
+        if not is_admin and not (ObjectId(claims['user_id']) in project.allowed_users):
+            raise GraphQLError(STATUS_CODE[51], extensions={'code': 51})
+
+        factors = await run_in_threadpool(factors_cache.get, project.id)
+
+        if factors is None:
+            raise GraphQLError(STATUS_CODE[212], extensions={'code': 212})
+
+        similar = await run_in_threadpool(similar_items, factors, item_id, n)
+
+        if similar is None:
+            raise GraphQLError(STATUS_CODE[216], extensions={'code': 216})
+
+        item_ids, scores = similar
+        item_ids = item_ids.tolist()
+
+        all_metadata = await db.engine.find(
+            Metadata,
+            (Metadata.project == project.id) & (Metadata.meta_id.in_(item_ids))
+        )
+        metadata_by_id = {metadata.meta_id: metadata for metadata in all_metadata}
+
+        return [
+            SimilarItemModel(
+                item_id=similar_item_id,
+                metadata=metadata_by_id.get(similar_item_id),
+                score=score
+            )
+            for similar_item_id, score in zip(item_ids, scores.tolist())
+        ]
+
     @staticmethod
     @gql_full_jwt_required
     async def resolve_user_purchases(self, info, **kwargs):
@@ -772,39 +1042,21 @@ class ApiQuery(graphene.ObjectType):
             raise GraphQLError(STATUS_CODE[204], extensions={'code': 204})
 
         purchases_with_users = []
+        all_metadata = await get_metadata_loader(info).load_many(
+            (purchase.project.id, purchase.purchase_id) for purchase in purchases
+        )
 
-        for purchase in purchases:
+        for purchase, metadata in zip(purchases, all_metadata):
             project = purchase.project
 
             if project is None or project.deleted:
                 raise GraphQLError(STATUS_CODE[203], extensions={'code': 203})
 
-            allowed_users = await db.engine.find(User, User.id.in_(project.allowed_users))
-            real_allowed_users = []
-
-            for db_user in allowed_users:
-                if db_user is not None and not db_user.deleted:
-                    real_allowed_users.append(db_user)
-
-            project_with_users = ProjectModel(
-                id=project.id,
-                name=project.name,
-                analyzed=project.analyzed,
-                imported=project.imported,
-                deleted=project.deleted,
-                files=project.files,
-                allowed_users=real_allowed_users
-            )
+            project_with_users = await get_project_model_loader(info).load(project)
             new_purchase = PurchaseModel(
                 id=purchase.id,
                 user_id=purchase.user_id,
-                metadata=await db.engine.find_one(
-                    Metadata,
-                    (
-                        (Metadata.project == project_with_users.id) &
-                        (Metadata.meta_id == purchase.purchase_id)
-                    )
-                ),
+                metadata=metadata,
                 weight=purchase.weight,
                 project=project_with_users,
             )
@@ -813,6 +1065,55 @@ class ApiQuery(graphene.ObjectType):
 
         return purchases_with_users
 
+    @staticmethod
+    @gql_full_jwt_required
+    async def resolve_project_analysis_status(self, info, **kwargs):
+        claims = kwargs['jwt_claims']
+        is_admin = claims['access_level']['is_staff'] if claims is not None else False
+        project_id = kwargs.get('project_id', None)
+
+        if project_id is None:
+            raise GraphQLError(STATUS_CODE[50], extensions={'code': 50})
+
+        if not ObjectId.is_valid(project_id):
+            raise GraphQLError(STATUS_CODE[53], extensions={'code': 53})
+
+        project = await db.engine.find_one(Project, Project.id == ObjectId(project_id))
+
+        if project is None or project.deleted:
+            raise GraphQLError(STATUS_CODE[201], extensions={'code': 201})
+
+        user = await db.engine.find_one(User, User.id == ObjectId(claims['user_id']))
+
+        if user is None or user.deleted:
+            raise GraphQLError(STATUS_CODE[107], extensions={'code': 107})
+
+        if not is_admin and not (ObjectId(claims['user_id']) in project.allowed_users):
+            raise GraphQLError(STATUS_CODE[51], extensions={'code': 51})
+
+        status = await db.engine.find_one(AnalysisStatus, AnalysisStatus.project == project.id)
+
+        if status is None:
+            raise GraphQLError(STATUS_CODE[217], extensions={'code': 217})
+
+        return ProjectAnalysisStatusModel(
+            project_id=status.project,
+            state=status.state,
+            phase=status.phase,
+            started_at=status.started_at,
+            finished_at=status.finished_at,
+            error=status.error,
+            phases=[AnalysisPhaseModel(name=name, duration=duration) for name, duration in status.phases.items()],
+            rows=status.rows,
+            users=status.users,
+            items=status.items,
+            interactions=status.interactions,
+            scored_users=status.scored_users,
+            recommendations=status.recommendations,
+            partitions=status.partitions,
+            finished_partitions=status.finished_partitions
+        )
+
     @staticmethod
     @gql_full_jwt_required
     async def resolve_project_statistics(self, info, **kwargs):
@@ -853,59 +1154,21 @@ class ApiQuery(graphene.ObjectType):
         if not is_admin and not (ObjectId(claims['user_id']) in project.allowed_users):
             raise GraphQLError(STATUS_CODE[51], extensions={'code': 51})
 
-        allowed_users = await db.engine.find(User, User.id.in_(project.allowed_users))
-        real_allowed_users = []
-
-        for db_user in allowed_users:
-            if db_user is not None and not db_user.deleted:
-                real_allowed_users.append(db_user)
-
-        project_with_users = ProjectModel(
-            id=project.id,
-            name=project.name,
-            imported=project.imported,
-            analyzed=project.analyzed,
-            deleted=project.deleted,
-            files=project.files,
-            allowed_users=real_allowed_users
-        )
+        project_with_users = await get_project_model_loader(info).load(project)
 
-        if item is not None:
-            total_count = await db.engine.count(
-                Recommendation,
-                (
-                        (Recommendation.project == project.id) &
-                        (Recommendation.item_id == item.meta_id)
-                )
-            )
-        else:
-            total_count = await db.engine.count(
-                Recommendation,
-                Recommendation.project == project.id
-            )
+        histogram = await star_histogram(
+            db.engine.get_collection(Recommendation),
+            project.id,
+            item.meta_id if item is not None else None
+        )
+        total_count = sum(histogram.values())
 
         if total_count <= 0:
             raise GraphQLError(STATUS_CODE[208], extensions={'code': 208})
 
         statistics = []
-        for i in range(5, 0, -1):
-            if item is not None:
-                count = await db.engine.count(
-                    Recommendation,
-                    (
-                            (Recommendation.project == project.id) &
-                            (Recommendation.item_id == item.meta_id) &
-                            (Recommendation.user_item_weight == i)
-                    )
-                )
-            else:
-                count = await db.engine.count(
-                    Recommendation,
-                    (
-                            (Recommendation.project == project.id) &
-                            (Recommendation.user_item_weight == i)
-                    )
-                )
+        for i in STAR_RATINGS:
+            count = histogram.get(i, 0)
 
             statistics.append(
                 ProjectInnerStatisticModel(
@@ -972,6 +1235,10 @@ schema = graphene.Schema(query=ApiQuery, mutation=ApiMutation, types=[
     PurchaseModel,
     ProjectModel,
     RecommendationModel,
+    LiveRecommendationModel,
+    SimilarItemModel,
+    ProjectAnalysisStatusModel,
+    AnalysisPhaseModel,
     ProjectStatisticsModel,
     ProjectInnerStatisticModel,
 ])
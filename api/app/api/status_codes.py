@@ -34,6 +34,15 @@ STATUS_CODE = {
     208: "Project is empty or has not enough data to show statistics",
     209: "Provided item id is incorrect",
     210: "Provided stars value is incorrect. Correct values are between 1 and 5.",
+    211: "Unknown weighting scheme",
+    212: "Project has no trained model yet",
+    213: "Requested user not found in the project model",
+    214: "Provided n or offset value is incorrect",
+    215: "Provided training parameters are incorrect",
+    216: "Requested item not found in the project model",
+    217: "Project has no analysis status yet",
+    218: "Provided page size is incorrect",
+    219: "Provided cursor is incorrect",
     # Upload related
     900: "Unable to upload file(-s)"
 }
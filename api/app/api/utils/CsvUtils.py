@@ -0,0 +1,54 @@
+from typing import Iterator
+
+import pandas as pd
+
+CSV_CHUNK_SIZE = 10 ** 6
+ID_DTYPE = 'int64'
+
+
+def downcast_ids(chunk: pd.DataFrame, columns) -> pd.DataFrame:
+    for column in columns:
+        chunk[column] = pd.to_numeric(chunk[column], downcast='integer')
+    return chunk
+
+
+def read_metadata_csv(location: str, project_metadata, chunksize: int = CSV_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    id_header = project_metadata['meta_id_header']
+    name_header = project_metadata['meta_name_header']
+
+    columns = [id_header]
+    dtypes = {}
+    if name_header is not None:
+        columns.append(name_header)
+        dtypes[name_header] = 'object'
+
+    with pd.read_csv(
+            location,
+            chunksize=chunksize,
+            encoding='utf8',
+            usecols=columns,
+            dtype=dtypes
+    ) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def read_subscriptions_csv(
+        location: str,
+        project_metadata,
+        chunksize: int = CSV_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    id_columns = [
+        project_metadata['subscriptions_user_id_header'],
+        project_metadata['subscriptions_meta_id_header'],
+    ]
+
+    with pd.read_csv(
+            location,
+            chunksize=chunksize,
+            encoding='utf8',
+            usecols=id_columns,
+            dtype={column: ID_DTYPE for column in id_columns}
+    ) as reader:
+        for chunk in reader:
+            yield downcast_ids(chunk, id_columns)
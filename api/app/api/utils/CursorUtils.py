@@ -0,0 +1,116 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from odmantic import ObjectId
+
+CONNECTION_DEFAULT_PAGE_SIZE = 10
+CONNECTION_MAX_PAGE_SIZE = 100
+
+PURCHASES_SORT_FIELDS = {
+    'userId': 'user_id',
+    'purchaseId': 'purchase_id',
+    'weight': 'weight',
+}
+RECOMMENDATIONS_SORT_FIELDS = {
+    'userId': 'user_id',
+    'userItemWeight': 'user_item_weight',
+    'score': 'score',
+    'itemId': 'item_id',
+}
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(sort_field: str, value, document_id: ObjectId) -> str:
+    payload = json.dumps([sort_field, value, str(document_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, sort_field: str) -> Tuple[object, ObjectId]:
+    try:
+        cursor_field, value, document_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise InvalidCursor()
+
+    if cursor_field != sort_field or not ObjectId.is_valid(document_id):
+        raise InvalidCursor()
+
+    return value, ObjectId(document_id)
+
+
+def parse_order_by(order_by: Optional[str], sort_fields: dict, default: str) -> Tuple[str, int]:
+    order_by = order_by or default
+    direction = -1 if order_by[0] == '-' else 1
+    sort_key = order_by[1:] if direction == -1 else order_by
+
+    return sort_fields.get(sort_key, sort_fields[default.lstrip('-')]), direction
+
+
+def purchases_filter(project_id: ObjectId, search: Optional[int] = None) -> dict:
+    base_filter = {'project': project_id}
+    if search is not None:
+        base_filter['$or'] = [{'purchase_id': search}, {'user_id': search}]
+
+    return base_filter
+
+
+def recommendations_filter(
+        project_id: ObjectId,
+        item_id: Optional[int] = None,
+        stars: Optional[int] = None,
+        search: Optional[int] = None
+) -> dict:
+    base_filter = {'project': project_id}
+    if item_id is not None:
+        base_filter['item_id'] = item_id
+    if stars is not None:
+        base_filter['user_item_weight'] = stars
+    if search is not None:
+        base_filter['$or'] = [{'user_id': search}, {'user_item_weight': search}]
+        if item_id is None:
+            base_filter['$or'].append({'item_id': search})
+
+    return base_filter
+
+
+def keyset_sort(sort_field: str, direction: int) -> List[Tuple[str, int]]:
+    return [(sort_field, direction), ('_id', direction)]
+
+
+def keyset_filter(base_filter: dict, sort_field: str, direction: int, after: Optional[str]) -> dict:
+    if after is None:
+        return base_filter
+
+    value, document_id = decode_cursor(after, sort_field)
+    operator = '$lt' if direction == -1 else '$gt'
+
+    return {
+        '$and': [
+            base_filter,
+            {
+                '$or': [
+                    {sort_field: {operator: value}},
+                    {sort_field: value, '_id': {operator: document_id}},
+                ]
+            },
+        ]
+    }
+
+
+async def find_keyset_page(
+        collection,
+        base_filter: dict,
+        sort_field: str,
+        direction: int,
+        first: int,
+        after: Optional[str] = None
+) -> Tuple[List[dict], bool]:
+    cursor = collection.find(keyset_filter(base_filter, sort_field, direction, after)) \
+        .sort(keyset_sort(sort_field, direction)) \
+        .limit(first + 1)
+    documents = await cursor.to_list(length=first + 1)
+
+    return documents[:first], len(documents) > first
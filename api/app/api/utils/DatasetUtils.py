@@ -0,0 +1,197 @@
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.api.utils.CsvUtils import read_subscriptions_csv
+from app.api.utils.FileUtils import file_checksum
+from app.settings import UPLOAD_FILE_PATH
+
+INTERACTIONS_CACHE_FOLDER = 'interactions_cache'
+INTERACTIONS_CACHE_ARRAYS = ('user_codes', 'item_codes', 'weights', 'user_index', 'item_index')
+AGGREGATION_COMPACT_THRESHOLD = 5 * 10 ** 6
+
+
+def smallest_int_dtype(max_value: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def encode_column(values) -> Tuple[np.ndarray, np.ndarray]:
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(smallest_int_dtype(max(len(uniques) - 1, 0))), np.asarray(uniques, dtype=np.int64)
+
+
+class PurchasesAggregator:
+    def __init__(self, compact_threshold: int = AGGREGATION_COMPACT_THRESHOLD):
+        self.compact_threshold = compact_threshold
+        self.total_rows = 0
+        self.user_index = pd.Index([], dtype=np.int64)
+        self.item_index = pd.Index([], dtype=np.int64)
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._weights = np.empty(0, dtype=np.int64)
+        self._pending = []
+        self._pending_rows = 0
+
+    @staticmethod
+    def _encode(index: pd.Index, values: np.ndarray) -> Tuple[pd.Index, np.ndarray]:
+        codes = index.get_indexer(values)
+        missing = codes < 0
+
+        if missing.any():
+            index = index.append(pd.Index(pd.unique(values[missing])))
+            codes[missing] = index.get_indexer(values[missing])
+
+        return index, codes.astype(np.uint64)
+
+    def add(self, user_ids, item_ids) -> None:
+        self.user_index, user_codes = self._encode(self.user_index, np.asarray(user_ids))
+        self.item_index, item_codes = self._encode(self.item_index, np.asarray(item_ids))
+
+        self.total_rows += len(user_codes)
+        if len(user_codes) == 0:
+            return
+
+        keys, counts = np.unique((user_codes << np.uint64(32)) | item_codes, return_counts=True)
+        self._pending.append((keys, counts))
+        self._pending_rows += len(keys)
+
+        if self._pending_rows >= max(self.compact_threshold, len(self._keys)):
+            self._compact()
+
+    def _compact(self) -> None:
+        # Packed keys only differ in their high bits, which hash poorly, so totals are merged by sorting.
+        keys = np.concatenate([self._keys] + [keys for keys, _ in self._pending])
+        weights = np.concatenate([self._weights] + [counts for _, counts in self._pending])
+        self._pending = []
+        self._pending_rows = 0
+
+        if len(keys) == 0:
+            return
+
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        weights = weights[order]
+        boundaries = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+        self._keys = keys[boundaries]
+        self._weights = np.add.reduceat(weights, boundaries).astype(np.int64)
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if len(self._pending) > 0:
+            self._compact()
+
+        user_codes = (self._keys >> np.uint64(32)).astype(np.int64)
+        item_codes = (self._keys & np.uint64(0xFFFFFFFF)).astype(np.int64)
+
+        return (
+            self.user_index.to_numpy()[user_codes],
+            self.item_index.to_numpy()[item_codes],
+            self._weights
+        )
+
+
+def aggregate_subscriptions_file(
+        location: str,
+        project_metadata,
+        stats: Dict[str, float] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    user_id_header = project_metadata['subscriptions_user_id_header']
+    meta_id_header = project_metadata['subscriptions_meta_id_header']
+    stats = stats if stats is not None else {}
+
+    aggregator = PurchasesAggregator()
+    chunks = read_subscriptions_csv(location, project_metadata)
+    read_time, aggregate_time = 0.0, 0.0
+
+    while True:
+        started_at = time.perf_counter()
+        chunk = next(chunks, None)
+        read_time += time.perf_counter() - started_at
+        if chunk is None:
+            break
+
+        started_at = time.perf_counter()
+        aggregator.add(chunk[user_id_header].to_numpy(), chunk[meta_id_header].to_numpy())
+        aggregate_time += time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    result = aggregator.result()
+    aggregate_time += time.perf_counter() - started_at
+
+    stats['read'] = stats.get('read', 0.0) + read_time
+    stats['aggregate'] = stats.get('aggregate', 0.0) + aggregate_time
+    stats['rows'] = aggregator.total_rows
+
+    return result
+
+
+def encode_interactions(user_ids, item_ids, weights) -> Dict[str, np.ndarray]:
+    user_codes, user_index = encode_column(user_ids)
+    item_codes, item_index = encode_column(item_ids)
+    weights = np.asarray(weights)
+
+    return {
+        'user_codes': user_codes,
+        'item_codes': item_codes,
+        'weights': weights.astype(smallest_int_dtype(int(weights.max()) if len(weights) > 0 else 0)),
+        'user_index': user_index,
+        'item_index': item_index,
+    }
+
+
+def interactions_cache_path(content_hash: str, project_metadata) -> Path:
+    cache_key = hashlib.sha256('\0'.join([
+        content_hash,
+        project_metadata['subscriptions_user_id_header'],
+        project_metadata['subscriptions_meta_id_header'],
+    ]).encode('utf8')).hexdigest()
+
+    return Path(str(Path().absolute()) + UPLOAD_FILE_PATH + INTERACTIONS_CACHE_FOLDER + '/' + cache_key)
+
+
+def save_interactions_cache(cache_path: Path, user_ids, item_ids, weights) -> None:
+    if cache_path.exists():
+        return
+
+    temporary_path = cache_path.with_name(cache_path.name + '.tmp.' + str(os.getpid()))
+    temporary_path.mkdir(parents=True, exist_ok=True)
+
+    for name, values in encode_interactions(user_ids, item_ids, weights).items():
+        np.save(str(temporary_path / (name + '.npy')), values)
+
+    try:
+        os.rename(str(temporary_path), str(cache_path))
+    except OSError:
+        shutil.rmtree(str(temporary_path), ignore_errors=True)
+
+
+def open_interactions_cache(cache_path: Path) -> Dict[str, np.ndarray]:
+    return {
+        name: np.load(str(cache_path / (name + '.npy')), mmap_mode='r') for name in INTERACTIONS_CACHE_ARRAYS
+    }
+
+
+def load_interactions(
+        location: str,
+        content_hash,
+        project_metadata,
+        stats: Dict[str, float] = None
+) -> Dict[str, np.ndarray]:
+    if content_hash is None:
+        content_hash = file_checksum(Path(location))
+
+    cache_path = interactions_cache_path(content_hash, project_metadata)
+
+    if not cache_path.exists():
+        user_ids, item_ids, weights = aggregate_subscriptions_file(location, project_metadata, stats)
+        save_interactions_cache(cache_path, user_ids, item_ids, weights)
+
+    return open_interactions_cache(cache_path)
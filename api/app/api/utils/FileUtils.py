@@ -1,12 +1,56 @@
-import shutil
+import hashlib
+import os
+import uuid
 from pathlib import Path
+from typing import BinaryIO, Tuple
 
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-async def save_uploaded_file(upload_file: UploadFile, destination: Path) -> None:
+
+def copy_with_checksum(source: BinaryIO, destination: Path) -> Tuple[str, int]:
+    content_hash = hashlib.sha256()
+    size = 0
+
+    # Readers of the destination either see the previous file or the complete new one, never a partial write.
+    temporary_destination = destination.with_name('.' + destination.name + '.' + uuid.uuid4().hex + '.tmp')
+
+    try:
+        with temporary_destination.open("wb") as buffer:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                content_hash.update(chunk)
+                buffer.write(chunk)
+                size += len(chunk)
+
+        os.replace(str(temporary_destination), str(destination))
+    except BaseException:
+        if temporary_destination.exists():
+            temporary_destination.unlink()
+        raise
+
+    return content_hash.hexdigest(), size
+
+
+def file_checksum(path: Path) -> str:
+    content_hash = hashlib.sha256()
+
+    with path.open("rb") as buffer:
+        while True:
+            chunk = buffer.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            content_hash.update(chunk)
+
+    return content_hash.hexdigest()
+
+
+async def save_uploaded_file(upload_file: UploadFile, destination: Path) -> Tuple[str, int]:
     try:
-        with destination.open("wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
+        return await run_in_threadpool(copy_with_checksum, upload_file.file, destination)
     finally:
-        upload_file.file.close()
+        await run_in_threadpool(upload_file.file.close)
@@ -0,0 +1,147 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+
+from odmantic import AIOEngine, Model, ObjectId
+
+from app.api.utils.CursorUtils import encode_cursor, keyset_filter, keyset_sort, purchases_filter, \
+    recommendations_filter, CONNECTION_MAX_PAGE_SIZE, PURCHASES_SORT_FIELDS, RECOMMENDATIONS_SORT_FIELDS
+from app.api.utils.StatisticsUtils import recommendations_match_stage, star_histogram_pipeline
+from app.database.models.AnalysisStatus import AnalysisStatus
+from app.database.models.Metadata import Metadata
+from app.database.models.ModelIndexes import MODEL_INDEXES
+from app.database.models.Purchase import Purchase
+from app.database.models.Recommendation import Recommendation
+from app.database.models.User import User
+
+
+async def ensure_indexes(engine: AIOEngine) -> List[str]:
+    created = []
+
+    for model in dict.fromkeys(index.model for index in MODEL_INDEXES):
+        indexes = [index.index_model() for index in MODEL_INDEXES if index.model is model]
+        created += await engine.get_collection(model).create_indexes(indexes)
+
+    return created
+
+
+class QueryShape(NamedTuple):
+    model: Type[Model]
+    query_filter: dict
+    sort: Optional[List[Tuple[str, int]]]
+    # Bounded queries match a handful of documents (one user, one searched id), so sorting them in memory is fine.
+    bounded: bool = False
+
+
+def connection_shapes(name: str, model: Type[Model], base_filter: dict, sort_fields: dict, bounded: bool):
+    cursor_id = ObjectId()
+
+    for sort_key, sort_field in sort_fields.items():
+        for direction in (1, -1):
+            order = ('-' if direction == -1 else '') + sort_key
+            # Page-numbered lists sort on the field alone, connections add _id and the keyset cursor.
+            yield '%s order=%s' % (name, order), QueryShape(model, base_filter, [(sort_field, direction)], bounded)
+            for after in (None, encode_cursor(sort_field, 0, cursor_id)):
+                yield '%s order=%s after=%s' % (name, order, after is not None), QueryShape(
+                    model,
+                    keyset_filter(base_filter, sort_field, direction, after),
+                    keyset_sort(sort_field, direction),
+                    bounded
+                )
+
+
+def resolver_query_shapes(project_id: ObjectId) -> Dict[str, QueryShape]:
+    # Filters and sorts are built with the same helpers the resolvers use; the values are placeholders,
+    # only the shape of each query matters for the chosen plan.
+    shapes = {}
+
+    for search in (None, 0):
+        shapes.update(connection_shapes(
+            'purchases search=%s' % (search is not None),
+            Purchase,
+            purchases_filter(project_id, search),
+            PURCHASES_SORT_FIELDS,
+            search is not None
+        ))
+
+        for item_id in (None, 0):
+            for stars in (None, 5):
+                shapes.update(connection_shapes(
+                    'recommendations item=%s stars=%s search=%s' % (
+                        item_id is not None, stars is not None, search is not None
+                    ),
+                    Recommendation,
+                    recommendations_filter(project_id, item_id, stars, search),
+                    RECOMMENDATIONS_SORT_FIELDS,
+                    search is not None
+                ))
+
+    shapes.update({
+        'user_purchases': QueryShape(Purchase, {'project': project_id, 'user_id': 0}, None, True),
+        'user_recommendations': QueryShape(
+            Recommendation, {'project': project_id, 'user_id': 0}, [('score', -1)], True
+        ),
+        'metadata': QueryShape(Metadata, {'project': project_id, 'meta_id': {'$in': [0]}}, None),
+        'analysis_status': QueryShape(AnalysisStatus, {'project': project_id}, None),
+        'user_by_email': QueryShape(User, {'email': '', 'deleted': False}, None),
+    })
+
+    return shapes
+
+
+def winning_plan_stages(explain) -> List[str]:
+    stages = []
+
+    def collect(node, in_winning_plan: bool):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == 'stage' and in_winning_plan:
+                    stages.append(value)
+                collect(value, in_winning_plan or key in ('winningPlan', 'queryPlan'))
+        elif isinstance(node, list):
+            for value in node:
+                collect(value, in_winning_plan)
+
+    collect(explain, False)
+
+    return stages
+
+
+async def explain_resolver_queries(
+        engine: AIOEngine,
+        project_id: ObjectId = None
+) -> Tuple[Dict[str, QueryShape], Dict[str, List[str]]]:
+    project_id = project_id or ObjectId()
+    shapes = resolver_query_shapes(project_id)
+    plans = {}
+
+    for name, shape in shapes.items():
+        cursor = engine.get_collection(shape.model).find(shape.query_filter).limit(CONNECTION_MAX_PAGE_SIZE + 1)
+        if shape.sort is not None:
+            cursor = cursor.sort(shape.sort)
+        plans[name] = winning_plan_stages(await cursor.explain())
+
+    for name, item_id in (('statistics', None), ('item_statistics', 0)):
+        shapes[name] = QueryShape(Recommendation, recommendations_match_stage(project_id, item_id)['$match'], None)
+        explain = await engine.database.command(
+            'aggregate',
+            engine.get_collection(Recommendation).name,
+            pipeline=star_histogram_pipeline(project_id, item_id),
+            explain=True
+        )
+        plans[name] = winning_plan_stages(explain)
+
+    return shapes, plans
+
+
+def unindexed_queries(shapes: Dict[str, QueryShape], plans: Dict[str, List[str]]) -> List[str]:
+    # A collection scan reads every document; a blocking SORT reads every match before returning the first page.
+    return [
+        name for name, stages in plans.items()
+        if 'COLLSCAN' in stages or ('SORT' in stages and not shapes[name].bounded)
+    ]
+
+
+async def apply_indexes(engine: AIOEngine) -> Tuple[List[str], List[str]]:
+    created = await ensure_indexes(engine)
+    unindexed = unindexed_queries(*await explain_resolver_queries(engine))
+
+    return created, unindexed
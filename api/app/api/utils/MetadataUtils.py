@@ -0,0 +1,102 @@
+import time
+
+import pandas as pd
+from pymongo import UpdateOne
+
+from app.api.utils.CsvUtils import read_metadata_csv
+from app.database.models.Metadata import Metadata
+from app.logger import logger
+
+METADATA_LOOKUP_BATCH_SIZE = 10000
+METADATA_WRITE_BATCH_SIZE = 10000
+
+
+def prepare_metadata_chunk(chunk: pd.DataFrame, id_header: str, name_header: str = None) -> pd.DataFrame:
+    with_name = name_header is not None
+    key_columns = ['meta_id', 'name'] if with_name else ['meta_id']
+
+    chunk = chunk.rename(columns={id_header: 'meta_id', name_header: 'name'})
+    chunk = chunk.dropna(subset=['meta_id']).drop_duplicates(subset=key_columns)
+    chunk['meta_id'] = chunk['meta_id'].astype('int64')
+    if with_name:
+        # Names are cast to object before masking, otherwise missing names are stored as NaN instead of null.
+        names = chunk['name']
+        chunk['name'] = names.astype(str).astype(object).where(names.notna(), None)
+
+    return chunk.astype(object)
+
+
+async def find_existing_metadata_keys(collection, project_id, keys: pd.DataFrame, with_name: bool) -> set:
+    existing_keys = set()
+
+    for start in range(0, len(keys), METADATA_LOOKUP_BATCH_SIZE):
+        batch = keys.iloc[start:start + METADATA_LOOKUP_BATCH_SIZE]
+        cursor = collection.find(
+            {'project': project_id, 'meta_id': {'$in': batch['meta_id'].tolist()}},
+            {'_id': 0, 'meta_id': 1, 'name': 1}
+        )
+
+        async for document in cursor:
+            if with_name:
+                existing_keys.add((document['meta_id'], document.get('name')))
+            else:
+                existing_keys.add(document['meta_id'])
+
+    return existing_keys
+
+
+async def write_metadata_chunk(collection, project_id, chunk: pd.DataFrame, with_name: bool) -> int:
+    written = 0
+
+    for start in range(0, len(chunk), METADATA_WRITE_BATCH_SIZE):
+        batch = chunk.iloc[start:start + METADATA_WRITE_BATCH_SIZE]
+        operations = []
+
+        for row in batch.itertuples(index=False):
+            key = {'project': project_id, 'meta_id': row.meta_id}
+            if with_name:
+                key['name'] = row.name
+            operations.append(UpdateOne(key, {'$setOnInsert': {'name': row.name if with_name else None}}, upsert=True))
+
+        if len(operations) > 0:
+            result = await collection.bulk_write(operations, ordered=False)
+            written += result.upserted_count
+
+    return written
+
+
+async def bulk_import_metadata(engine, project_id, file_path: str, project_metadata) -> int:
+    collection = engine.get_collection(Metadata)
+    id_header = project_metadata['meta_id_header']
+    name_header = project_metadata['meta_name_header']
+    with_name = name_header is not None
+
+    started_at = time.perf_counter()
+    total_rows = 0
+    total_written = 0
+
+    for chunk in read_metadata_csv(file_path, project_metadata):
+        total_rows += len(chunk)
+
+        chunk = prepare_metadata_chunk(chunk, id_header, name_header)
+
+        existing_keys = await find_existing_metadata_keys(collection, project_id, chunk, with_name)
+        if len(existing_keys) > 0:
+            if with_name:
+                chunk_keys = pd.Series(list(zip(chunk['meta_id'], chunk['name'])), index=chunk.index)
+            else:
+                chunk_keys = chunk['meta_id']
+            chunk = chunk[~chunk_keys.isin(existing_keys)]
+
+        total_written += await write_metadata_chunk(collection, project_id, chunk, with_name)
+
+    elapsed = time.perf_counter() - started_at
+    logger.info(
+        'Metadata import: %d rows read, %d inserted in %.2fs (%.0f rows/s)',
+        total_rows,
+        total_written,
+        elapsed,
+        total_rows / elapsed if elapsed > 0 else 0
+    )
+
+    return total_written
@@ -0,0 +1,123 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.api.utils.SimilarityUtils import SIMILARITY_INDEX_ARRAYS
+from app.settings import UPLOAD_FILE_PATH
+
+MODELS_FOLDER = 'models'
+MODEL_MANIFEST_FILE_NAME = 'manifest.json'
+MODEL_ARRAYS = ('user_factors', 'item_factors', 'user_index', 'item_index')
+MODEL_VERSIONS_TO_KEEP = 2
+
+
+def model_path(project_id) -> Path:
+    return Path(str(Path().absolute()) + UPLOAD_FILE_PATH + MODELS_FOLDER + '/' + str(project_id))
+
+
+def write_json_atomically(destination: Path, content: dict) -> None:
+    temporary_destination = destination.with_name(destination.name + '.tmp.' + str(os.getpid()))
+    with temporary_destination.open('w') as buffer:
+        json.dump(content, buffer)
+    os.replace(str(temporary_destination), str(destination))
+
+
+def load_manifest(project_id) -> Optional[dict]:
+    manifest_path = model_path(project_id) / MODEL_MANIFEST_FILE_NAME
+
+    try:
+        with manifest_path.open('r') as buffer:
+            return json.load(buffer)
+    except FileNotFoundError:
+        return None
+
+
+def prune_model_versions(project_id, current_version: str) -> None:
+    versions = sorted(
+        path.name for path in model_path(project_id).iterdir()
+        if path.is_dir() and not path.name.startswith('.')
+    )
+
+    for version in versions[:-MODEL_VERSIONS_TO_KEEP]:
+        if version != current_version:
+            shutil.rmtree(str(model_path(project_id) / version), ignore_errors=True)
+
+
+def save_model(
+        project_id,
+        user_factors,
+        item_factors,
+        user_index,
+        item_index,
+        parameters: dict = None,
+        similarity_index: Dict[str, np.ndarray] = None
+) -> str:
+    version = datetime.utcnow().strftime('%Y%m%d%H%M%S%f')
+    project_path = model_path(project_id)
+    temporary_path = project_path / ('.' + version + '.tmp')
+    temporary_path.mkdir(parents=True, exist_ok=True)
+
+    arrays = {
+        'user_factors': np.ascontiguousarray(user_factors, dtype=np.float32),
+        'item_factors': np.ascontiguousarray(item_factors, dtype=np.float32),
+        'user_index': np.asarray(user_index),
+        'item_index': np.asarray(item_index),
+    }
+    arrays.update(similarity_index or {})
+    for name, values in arrays.items():
+        np.save(str(temporary_path / (name + '.npy')), values)
+
+    os.rename(str(temporary_path), str(project_path / version))
+
+    write_json_atomically(project_path / MODEL_MANIFEST_FILE_NAME, {
+        'version': version,
+        'created_at': datetime.utcnow().isoformat(),
+        'users': int(arrays['user_factors'].shape[0]),
+        'items': int(arrays['item_factors'].shape[0]),
+        'factors': int(arrays['item_factors'].shape[1]),
+        'parameters': parameters or {},
+    })
+
+    prune_model_versions(project_id, version)
+
+    return version
+
+
+def load_model(project_id, version: str = None) -> Optional[Dict[str, np.ndarray]]:
+    if version is None:
+        manifest = load_manifest(project_id)
+        if manifest is None:
+            return None
+        version = manifest['version']
+
+    version_path = model_path(project_id) / version
+    if not version_path.exists():
+        return None
+
+    model = {name: np.load(str(version_path / (name + '.npy')), mmap_mode='r') for name in MODEL_ARRAYS}
+    for name in SIMILARITY_INDEX_ARRAYS:
+        array_path = version_path / (name + '.npy')
+        if array_path.exists():
+            model[name] = np.load(str(array_path), mmap_mode='r')
+
+    return model
+
+
+def save_model_array(project_id, version: str, name: str, values: np.ndarray) -> None:
+    version_path = model_path(project_id) / version
+    temporary_path = version_path / ('.' + name + '.tmp.' + str(os.getpid()) + '.npy')
+    np.save(str(temporary_path), values)
+    os.replace(str(temporary_path), str(version_path / (name + '.npy')))
+
+
+def load_model_array(project_id, version: str, name: str) -> Optional[np.ndarray]:
+    array_path = model_path(project_id) / version / (name + '.npy')
+    if not array_path.exists():
+        return None
+
+    return np.load(str(array_path), mmap_mode='r')
@@ -0,0 +1,148 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from app import settings
+from app.api.utils.ModelUtils import load_manifest, load_model, model_path, MODEL_MANIFEST_FILE_NAME
+from app.api.utils.SimilarityUtils import SIMILARITY_INDEX_ARRAYS
+
+LIVE_RECOMMENDATIONS_MAX_N = 100
+
+
+class ProjectFactorsCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    @staticmethod
+    def _manifest_mtime(project_id) -> Optional[int]:
+        try:
+            return os.stat(str(model_path(project_id) / MODEL_MANIFEST_FILE_NAME)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry['size']
+
+    def _remove(self, project_id) -> None:
+        entry = self._entries.pop(project_id, None)
+        if entry is not None:
+            self.size -= entry['size']
+
+    def _lookup(self, project_id: str, manifest_mtime: Optional[int]) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is not None and entry['manifest_mtime'] == manifest_mtime:
+                self._entries.move_to_end(project_id)
+                return entry
+
+        return None
+
+    def _load_lock(self, project_id: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(project_id, threading.Lock())
+
+    @staticmethod
+    def _load(project_id: str, manifest_mtime: Optional[int]) -> Optional[Dict[str, np.ndarray]]:
+        manifest = load_manifest(project_id)
+        model = load_model(project_id, manifest['version']) if manifest is not None else None
+        if model is None:
+            return None
+
+        # Item factors and the similarity index are scanned on every call, so they are kept in RAM;
+        # user rows stay memory-mapped.
+        entry = {
+            'user_factors': model['user_factors'],
+            'item_factors': np.array(model['item_factors']),
+            'user_index': model['user_index'],
+            'item_index': np.array(model['item_index']),
+            'manifest_mtime': manifest_mtime,
+        }
+        entry['size'] = entry['item_factors'].nbytes + entry['item_index'].nbytes
+
+        for name in SIMILARITY_INDEX_ARRAYS:
+            if name in model:
+                entry[name] = np.array(model[name])
+                entry['size'] += entry[name].nbytes
+
+        return entry
+
+    def get(self, project_id) -> Optional[Dict[str, np.ndarray]]:
+        project_id = str(project_id)
+        manifest_mtime = self._manifest_mtime(project_id)
+
+        entry = self._lookup(project_id, manifest_mtime)
+        if entry is not None:
+            return entry
+
+        # Disk loads only hold the project's own lock, so a reload never stalls lookups for other projects;
+        # the shared lock just guards the LRU bookkeeping.
+        with self._load_lock(project_id):
+            entry = self._lookup(project_id, manifest_mtime)
+            if entry is not None:
+                return entry
+
+            entry = self._load(project_id, manifest_mtime)
+
+            with self._lock:
+                self._remove(project_id)
+                if entry is not None:
+                    self._entries[project_id] = entry
+                    self.size += entry['size']
+                    self._evict()
+
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+factors_cache = ProjectFactorsCache(settings.FACTORS_CACHE_MAX_BYTES)
+
+
+def find_codes(index: np.ndarray, ids) -> np.ndarray:
+    if len(index) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    ids = np.asarray(ids, dtype=index.dtype)
+    positions = np.searchsorted(index, ids)
+    positions[positions >= len(index)] = 0
+    return positions[index[positions] == ids]
+
+
+def recommend_for_user(
+        factors: Dict[str, np.ndarray],
+        user_id: int,
+        n: int = 10,
+        offset: int = 0,
+        exclude: Iterable[int] = ()
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    user_codes = find_codes(factors['user_index'], [user_id])
+    if len(user_codes) < 1:
+        return None
+
+    item_factors = factors['item_factors']
+    scores = item_factors.dot(np.asarray(factors['user_factors'][user_codes[0]]))
+
+    excluded_codes = find_codes(factors['item_index'], list(exclude or []))
+    scores[excluded_codes] = -np.inf
+
+    available = len(scores) - len(np.unique(excluded_codes))
+    top = min(offset + n, available)
+    if top <= offset:
+        return np.empty(0, dtype=factors['item_index'].dtype), np.empty(0, dtype=scores.dtype)
+
+    candidates = np.argpartition(-scores, top - 1)[:top] if top < len(scores) else np.arange(len(scores))
+    ordered = candidates[np.argsort(-scores[candidates], kind='stable')][offset:top]
+
+    return factors['item_index'][ordered], scores[ordered]
@@ -0,0 +1,129 @@
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+SIMILARITY_INDEX_ARRAYS = ('similarity_centroids', 'similarity_offsets', 'similarity_items', 'similarity_vectors')
+SIMILARITY_KMEANS_ITERATIONS = 10
+SIMILARITY_KMEANS_SAMPLES_PER_LIST = 64
+SIMILARITY_ASSIGN_BLOCK_SIZE = 65536
+SIMILARITY_PROBES = 8
+SIMILAR_ITEMS_MAX_N = 100
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+
+    return vectors / norms
+
+
+def assign_to_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int32)
+
+    for start in range(0, len(vectors), SIMILARITY_ASSIGN_BLOCK_SIZE):
+        block = vectors[start:start + SIMILARITY_ASSIGN_BLOCK_SIZE]
+        assignments[start:start + len(block)] = block.dot(centroids.T).argmax(axis=1)
+
+    return assignments
+
+
+def train_centroids(vectors: np.ndarray, lists: int, iterations: int, seed: int) -> np.ndarray:
+    random = np.random.default_rng(seed)
+
+    samples_count = min(len(vectors), lists * SIMILARITY_KMEANS_SAMPLES_PER_LIST)
+    samples = vectors[np.sort(random.choice(len(vectors), samples_count, replace=False))]
+    centroids = samples[random.choice(len(samples), lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = assign_to_lists(samples, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, samples)
+
+        non_empty = np.bincount(assignments, minlength=lists) > 0
+        centroids[non_empty] = normalize_rows(sums[non_empty])
+
+    return centroids
+
+
+def build_similarity_index(
+        item_factors: np.ndarray,
+        lists: int = None,
+        iterations: int = SIMILARITY_KMEANS_ITERATIONS,
+        seed: int = 0
+) -> Dict[str, np.ndarray]:
+    vectors = normalize_rows(item_factors)
+
+    if lists is None:
+        lists = int(math.sqrt(len(vectors)))
+    lists = max(1, min(lists, len(vectors)))
+
+    centroids = train_centroids(vectors, lists, iterations, seed)
+    assignments = assign_to_lists(vectors, centroids)
+
+    order = np.argsort(assignments, kind='stable').astype(np.int32)
+    offsets = np.zeros(lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignments, minlength=lists), out=offsets[1:])
+
+    return {
+        'similarity_centroids': centroids,
+        'similarity_offsets': offsets,
+        'similarity_items': order,
+        'similarity_vectors': vectors[order],
+    }
+
+
+def search_similarity_index(
+        index: Dict[str, np.ndarray],
+        query: np.ndarray,
+        probes: int = SIMILARITY_PROBES
+) -> Tuple[np.ndarray, np.ndarray]:
+    centroids = index['similarity_centroids']
+    offsets = index['similarity_offsets']
+
+    probes = min(probes, len(centroids))
+    centroid_scores = centroids.dot(query)
+    probed_lists = np.argpartition(-centroid_scores, probes - 1)[:probes] if probes < len(centroids) \
+        else np.arange(len(centroids))
+
+    # Lists are stored contiguously, so each probe scores a slice without gathering rows.
+    items, scores = [], []
+    for list_id in probed_lists:
+        start, end = offsets[list_id], offsets[list_id + 1]
+        items.append(index['similarity_items'][start:end])
+        scores.append(index['similarity_vectors'][start:end].dot(query))
+
+    return np.concatenate(items), np.concatenate(scores)
+
+
+def similar_items(
+        factors: Dict[str, np.ndarray],
+        item_id: int,
+        n: int = 10,
+        probes: int = SIMILARITY_PROBES
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    item_index = factors['item_index']
+    position = np.searchsorted(item_index, item_id)
+    if position >= len(item_index) or item_index[position] != item_id:
+        return None
+
+    query = normalize_rows(factors['item_factors'][position])
+
+    if factors.get('similarity_centroids') is not None:
+        codes, scores = search_similarity_index(factors, query, probes)
+    else:
+        codes = np.arange(len(item_index))
+        scores = normalize_rows(factors['item_factors']).dot(query)
+
+    keep = codes != position
+    codes, scores = codes[keep], scores[keep]
+
+    top = min(n, len(scores))
+    if top < 1:
+        return np.empty(0, dtype=item_index.dtype), np.empty(0, dtype=np.float32)
+
+    candidates = np.argpartition(-scores, top - 1)[:top] if top < len(scores) else np.arange(len(scores))
+    ordered = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+    return item_index[codes[ordered]], scores[ordered]
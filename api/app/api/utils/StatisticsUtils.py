@@ -0,0 +1,28 @@
+from typing import Dict, List
+
+STAR_RATINGS = (5, 4, 3, 2, 1)
+
+
+def recommendations_match_stage(project_id, item_id: int = None) -> dict:
+    # Equality on the leading fields of the (project, item_id, user_item_weight) index keeps the scan covered.
+    match = {'project': project_id}
+    if item_id is not None:
+        match['item_id'] = item_id
+
+    return {'$match': match}
+
+
+def star_histogram_pipeline(project_id, item_id: int = None) -> List[dict]:
+    return [
+        recommendations_match_stage(project_id, item_id),
+        {'$group': {'_id': '$user_item_weight', 'count': {'$sum': 1}}},
+    ]
+
+
+async def star_histogram(collection, project_id, item_id: int = None) -> Dict[int, int]:
+    histogram = {}
+
+    async for group in collection.aggregate(star_histogram_pipeline(project_id, item_id)):
+        histogram[group['_id']] = group['count']
+
+    return histogram
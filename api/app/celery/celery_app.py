@@ -1,12 +1,24 @@
 from celery import Celery
+from celery.signals import worker_init
 
 from app import settings
 
 broker_url = 'redis://:' + settings.REDIS_PASSWORD + '@redis:6379/0'
-celery_app = Celery('recommdo', broker=broker_url, include=['app.celery.celery_worker'])
+result_backend_url = 'redis://:' + settings.REDIS_PASSWORD + '@redis:6379/1'
+celery_app = Celery('recommdo', broker=broker_url, backend=result_backend_url, include=['app.celery.celery_worker'])
 celery_app.conf.task_routes = {
+    "app.celery.celery_worker.import_project_files": {'queue': 'celery'},
     "app.celery.celery_worker.import_and_analyze_purchases": {'queue': 'celery'},
-    "app.celery.celery_worker.analyze_purchases": {'queue': 'celery'}
+    "app.celery.celery_worker.analyze_purchases": {'queue': 'celery'},
+    "app.celery.celery_worker.score_recommendations_partition": {'queue': 'celery'},
+    "app.celery.celery_worker.finish_analysis": {'queue': 'celery'}
 }
 
-celery_app.conf.update(task_track_started=True)
+celery_app.conf.update(task_track_started=True, result_expires=24 * 60 * 60)
+
+
+@worker_init.connect
+def store_worker_concurrency(sender=None, **kwargs):
+    # The -c option only reaches the WorkController; keep it in the config so forked pool processes can read it.
+    if sender is not None and getattr(sender, 'concurrency', None):
+        celery_app.conf.worker_concurrency = sender.concurrency
@@ -1,22 +1,45 @@
 import asyncio
-import os
+import time
+from pathlib import Path
 
 import implicit
 import numpy as np
-import pandas as pd
 
+from celery import chord
+from celery.signals import worker_process_init, worker_process_shutdown, worker_ready
 from graphql import GraphQLError
+from threadpoolctl import threadpool_limits
 from motor.motor_asyncio import AsyncIOMotorClient
-from odmantic import AIOEngine
+from odmantic import AIOEngine, ObjectId
 from bson.json_util import loads
-from scipy import sparse
 
 from app import settings
 from app.api.status_codes import STATUS_CODE
+from app.api.utils.DatasetUtils import aggregate_subscriptions_file, load_interactions, save_interactions_cache, \
+    interactions_cache_path, open_interactions_cache
+from app.api.utils.FileUtils import file_checksum
+from app.api.utils.IndexUtils import apply_indexes
+from app.api.utils.MetadataUtils import bulk_import_metadata
+from app.api.utils.ModelUtils import save_model, load_manifest, load_model, save_model_array, load_model_array
+from app.api.utils.RecommendationUtils import find_codes
+from app.api.utils.SimilarityUtils import build_similarity_index
 from app.celery.celery_app import celery_app
+from app.celery.incremental import changed_user_ids, update_factors
+from app.celery.interactions import build_interaction_matrices
+from app.celery.progress import AnalysisProgress, track_failures
+from app.celery.recommendation_writer import stream_recommendations
+from app.celery.resources import task_thread_budget
+from app.celery.training import warm_start_factors
+from app.celery.weighting import apply_weighting
 from app.database.models.Project import Project
 from app.database.models.Purchase import Purchase
 from app.database.models.Recommendation import Recommendation
+from app.database.models.TrainingParameters import TrainingParameters
+from app.database.models.WeightingScheme import WeightingScheme
+
+USER_BATCH_SIZE = 10000
+SCORING_PARTITION_USERS = 250000
+SCORED_USERS_ARRAY = 'scored_users'
 
 
 def filter_file(files, file_type="metadata"):
@@ -27,23 +50,204 @@ def filter_file(files, file_type="metadata"):
     return filter(iterator_func, files)
 
 
-def get_engine() -> AIOEngine:
-    client = AsyncIOMotorClient(
+class WorkerContext:
+    loop: asyncio.AbstractEventLoop = None
+    client: AsyncIOMotorClient = None
+    engine: AIOEngine = None
+
+
+worker_context = WorkerContext()
+
+
+def create_motor_client(loop: asyncio.AbstractEventLoop) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
         host=settings.DATABASE_HOST,
         port=int(settings.DATABASE_PORT),
         username=settings.DATABASE_USERNAME,
         password=settings.DATABASE_PASSWORD,
         maxPoolSize=10,
         minPoolSize=10,
-        io_loop=asyncio.get_event_loop()
+        io_loop=loop
     )
 
-    return AIOEngine(motor_client=client, database=settings.DATABASE_NAME)
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    worker_context.loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(worker_context.loop)
+
+    worker_context.client = create_motor_client(worker_context.loop)
+    worker_context.engine = AIOEngine(motor_client=worker_context.client, database=settings.DATABASE_NAME)
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    if worker_context.client is not None:
+        worker_context.client.close()
+    if worker_context.loop is not None:
+        worker_context.loop.run_until_complete(worker_context.loop.shutdown_asyncgens())
+        worker_context.loop.close()
+
+    worker_context.loop = None
+    worker_context.client = None
+    worker_context.engine = None
+
+
+@worker_ready.connect
+def apply_worker_indexes(**kwargs):
+    # Runs in the main process once the pool is up, so the short-lived client is never shared with children.
+    loop = asyncio.new_event_loop()
+    client = create_motor_client(loop)
+    engine = AIOEngine(motor_client=client, database=settings.DATABASE_NAME)
+
+    try:
+        created_indexes, unindexed_queries = loop.run_until_complete(apply_indexes(engine))
+        print('Indexes ensured: %s' % ', '.join(created_indexes))
+        if len(unindexed_queries) > 0:
+            print('Queries without an index-backed plan: %s' % ', '.join(unindexed_queries))
+    finally:
+        client.close()
+        loop.close()
+
+
+def run_in_worker_loop(coroutine):
+    # worker_process_init only fires for prefork children, so the solo pool initialises lazily here.
+    if worker_context.loop is None or worker_context.loop.is_closed():
+        init_worker_process()
+
+    with threadpool_limits(limits=task_thread_budget()):
+        return worker_context.loop.run_until_complete(coroutine)
+
+
+def get_engine() -> AIOEngine:
+    if worker_context.engine is None:
+        init_worker_process()
+
+    return worker_context.engine
+
+
+def run_tracked(project_id, coroutine):
+    return run_in_worker_loop(track_failures(get_engine(), project_id, coroutine))
+
+
+def get_project_file_locations(project_template: Project):
+    try:
+        metadata_file_info = list(filter_file(project_template.files, "metadata"))[0]
+        subscriptions_file_info = list(filter_file(project_template.files, "subscriptions"))[0]
+    except IndexError:
+        metadata_file_info = None
+        subscriptions_file_info = None
+
+    if metadata_file_info is None:
+        raise GraphQLError(STATUS_CODE[205], extensions={'code': 205})
+    elif subscriptions_file_info is None:
+        raise GraphQLError(STATUS_CODE[206], extensions={'code': 206})
+
+    return metadata_file_info, subscriptions_file_info
+
+
+def load_previous_interactions(manifest, content_hash, project_metadata):
+    if manifest is None:
+        return None
+
+    previous_content_hash = manifest['parameters'].get('content_hash')
+    if previous_content_hash is None or content_hash is None:
+        return None
+
+    cache_path = interactions_cache_path(previous_content_hash, project_metadata)
+    if not cache_path.exists():
+        return None
+
+    return open_interactions_cache(cache_path)
+
+
+async def delete_user_documents(collection, project_id, user_ids: np.ndarray):
+    for start in range(0, len(user_ids), USER_BATCH_SIZE):
+        await collection.delete_many({
+            'project': project_id,
+            'user_id': {'$in': user_ids[start:start + USER_BATCH_SIZE].tolist()}
+        })
+
+
+async def insert_purchases(collection, project_template: Project, interactions, rows: np.ndarray):
+    for start in range(0, len(rows), USER_BATCH_SIZE):
+        batch = rows[start:start + USER_BATCH_SIZE]
+        purchases = []
+        for user_id, purchase_id, weight in zip(
+                interactions['user_index'][interactions['user_codes'][batch]].tolist(),
+                interactions['item_index'][interactions['item_codes'][batch]].tolist(),
+                interactions['weights'][batch].tolist()
+        ):
+            purchase = Purchase(
+                user_id=user_id,
+                purchase_id=purchase_id,
+                weight=weight,
+                project=project_template
+            )
+            purchases.append(purchase.doc())
+
+        await collection.insert_many(purchases, ordered=False)
+
+
+async def replace_user_purchases(engine, project_template: Project, user_ids: np.ndarray, interactions):
+    collection = engine.get_collection(Purchase)
+    await delete_user_documents(collection, project_template.id, user_ids)
+
+    user_codes = find_codes(interactions['user_index'], user_ids)
+    rows = np.flatnonzero(np.isin(interactions['user_codes'], user_codes))
+    await insert_purchases(collection, project_template, interactions, rows)
+
+
+async def import_project_files_async(project, project_metadata):
+    print('Import Files Task Started')
+    engine = get_engine()
+
+    project_template = Project.parse_doc(loads(project))
+    metadata_file_info, subscriptions_file_info = get_project_file_locations(project_template)
+
+    progress = AnalysisProgress(engine, project_template.id)
+    await progress.start()
+
+    async with progress.phase('metadata_import'):
+        await bulk_import_metadata(engine, project_template.id, metadata_file_info.location, project_metadata)
+
+    stats = {}
+    user_ids, item_ids, weights = aggregate_subscriptions_file(
+        subscriptions_file_info.location,
+        project_metadata,
+        stats
+    )
+    await progress.add_durations({'read': stats['read'], 'aggregate': stats['aggregate']})
+    await progress.set(rows=stats['rows'], interactions=len(weights))
+
+    if len(weights) < 1:
+        project_template.importing = False
+        await engine.save(project_template)
+        await progress.finish()
+        print('Import Files Task Ended: no subscriptions found')
+        return
+
+    # The content-hash-keyed interactions cache is the only dataset artifact; the import task and the
+    # analysis both open it, so nothing else is written or re-hashed here.
+    content_hash = subscriptions_file_info.content_hash or file_checksum(Path(subscriptions_file_info.location))
+
+    async with progress.phase('dataset_save'):
+        save_interactions_cache(interactions_cache_path(content_hash, project_metadata), user_ids, item_ids, weights)
+
+    print('Import Files Task Ended')
+
+    import_and_analyze_purchases.apply_async(args=[
+        project,
+        content_hash,
+        project_metadata,
+        True,
+        True
+    ], max_retries=3, retry=True)
 
 
 async def import_and_analyze_purchases_async(
         project,
-        dataset,
+        content_hash,
         project_metadata,
         change_import_bool=True,
         change_analysis_bool=True
@@ -52,20 +256,15 @@ async def import_and_analyze_purchases_async(
     engine = get_engine()
 
     project_template = Project.parse_doc(loads(project))
+    progress = AnalysisProgress(engine, project_template.id)
 
-    purchases = []
-    for (index, unq) in enumerate(dataset[0][0]):
-        purchase = Purchase(
-            user_id=int(unq[0]),
-            purchase_id=unq[1],
-            weight=int(dataset[0][1][index]),
-            project=project_template
-        )
-        purchases.append(purchase.doc())
-
-    await engine.get_collection(Purchase).insert_many(purchases, ordered=False)
+    async with progress.phase('purchases_import'):
+        interactions = open_interactions_cache(interactions_cache_path(content_hash, project_metadata))
+        rows = np.arange(len(interactions['weights']))
+        await insert_purchases(engine.get_collection(Purchase), project_template, interactions, rows)
 
     if change_import_bool:
+        project_template.importing = False
         project_template.imported = True
     if change_import_bool:
         await engine.save(project_template)
@@ -75,65 +274,13 @@ async def import_and_analyze_purchases_async(
     await analyze_purchases_async(project, project_metadata, engine, change_import_bool, change_analysis_bool)
 
 
-def set_normalized_weight(x) -> float:
-    normalized_weight = 1
-
-    if x > 1:
-        normalized_weight = 2
-    if x >= 5:
-        normalized_weight = 3
-    if x >= 10:
-        normalized_weight = 4
-    if x >= 20:
-        normalized_weight = 5
-
-    return normalized_weight
-
-
-def get_user_item_weight(score: float) -> int:
-    user_item_weight = 1
-
-    if score >= 0.019:
-        user_item_weight = 2
-    if score >= 0.04:
-        user_item_weight = 3
-    if score >= 0.49:
-        user_item_weight = 4
-    if score >= 1:
-        user_item_weight = 5
-
-    return user_item_weight
-
-
-async def get_all_recommendations(project, model, user_items, user_indexes, item_indexes, sparse_user_items, pm):
-    users_frame = user_items[pm['subscriptions_user_id_header'] + '_code'].drop_duplicates().reset_index()
-    users = users_frame[pm['subscriptions_user_id_header'] + '_code'].to_numpy()
-
-    all_recommendations = []
-    for user in users:
-        recommendations = model.recommend(user, sparse_user_items, filter_already_liked_items=False, N=10)
-        for recommendation in recommendations:
-            real_user = user_indexes[user].item()
-            real_item = item_indexes[recommendation[0]].item()
-            score = recommendation[1]
-            recommendation_model = Recommendation(
-                user_id=real_user,
-                project=project,
-                item_id=real_item,
-                score=score,
-                user_item_weight=get_user_item_weight(score)
-            )
-            all_recommendations.append(recommendation_model.doc())
-
-    return all_recommendations
-
-
 async def analyze_purchases_async(
         project,
         project_metadata_info,
         db_engine=None,
         change_import_bool=True,
-        change_analysis_bool=True
+        change_analysis_bool=True,
+        incremental=False
 ):
     print('DataSet Analysis Task Started')
     if db_engine is None:
@@ -143,95 +290,237 @@ async def analyze_purchases_async(
 
     project_template = Project.parse_doc(loads(project))
 
-    try:
-        metadata_file_info = list(filter_file(project_template.files, "metadata"))[0]
-        subscriptions_file_info = list(filter_file(project_template.files, "subscriptions"))[0]
-    except IndexError:
-        metadata_file_info = None
-        subscriptions_file_info = None
+    metadata_file_info, subscriptions_file_info = get_project_file_locations(project_template)
 
-    if metadata_file_info is None:
-        raise GraphQLError(STATUS_CODE[205], extensions={'code': 205})
-    elif subscriptions_file_info is None:
-        raise GraphQLError(STATUS_CODE[206], extensions={'code': 206})
+    progress = AnalysisProgress(engine, project_template.id)
+    # Imports start tracking in import_project_files, standalone analyses start it here.
+    if not change_import_bool:
+        await progress.start()
 
-    subscriptions_file = pd.read_csv(subscriptions_file_info.location)
-
-    no_duplicates = subscriptions_file.pivot_table(
-        index=[
-            project_metadata_info['subscriptions_user_id_header'],
-            project_metadata_info['subscriptions_meta_id_header']
-        ],
-        aggfunc='size'
-    ).reset_index().rename(columns={0: 'weight'})
-
-    no_duplicates['normalized_weight'] = \
-        no_duplicates['weight'].apply(lambda x: set_normalized_weight(x))
-
-    os.environ['MKL_NUM_THREADS'] = '1'
-    os.environ['OPENBLAS_NUM_THREADS'] = '1'
-
-    no_duplicates[project_metadata_info['subscriptions_user_id_header'] + '_code'], users_mapping_index =\
-        pd.Series(no_duplicates[project_metadata_info['subscriptions_user_id_header']]).factorize()
-    no_duplicates[project_metadata_info['subscriptions_meta_id_header'] + '_code'], items_mapping_index = \
-        pd.Series(no_duplicates[project_metadata_info['subscriptions_meta_id_header']]).factorize()
-
-    sparse_item_user = sparse.csr_matrix(
-        (
-            no_duplicates['normalized_weight'].astype(float),
-            (
-                no_duplicates[project_metadata_info['subscriptions_meta_id_header'] + '_code'],
-                no_duplicates[project_metadata_info['subscriptions_user_id_header'] + '_code'],
-            ),
-        )
-    )
-    sparse_user_item = sparse_item_user.T.tocsr()
+    threads = task_thread_budget()
+    print('Thread budget: %d' % threads)
 
-    model = implicit.als.AlternatingLeastSquares(
-        factors=140,
-        regularization=0.1,
-        iterations=40,
-        calculate_training_loss=False
+    stats = {}
+    await progress.set(phase='read')
+    started_at = time.perf_counter()
+    interactions = load_interactions(
+        subscriptions_file_info.location,
+        subscriptions_file_info.content_hash,
+        project_metadata_info,
+        stats
+    )
+    if 'rows' in stats:
+        await progress.add_durations({'read': stats['read'], 'aggregate': stats['aggregate']})
+        await progress.set(rows=stats['rows'])
+    else:
+        await progress.add_durations({'read': time.perf_counter() - started_at})
+
+    users_mapping_index = interactions['user_index']
+    items_mapping_index = interactions['item_index']
+    await progress.set(
+        users=len(users_mapping_index),
+        items=len(items_mapping_index),
+        interactions=len(interactions['weights'])
     )
 
-    alpha_val = 40
-    data_conf = (sparse_item_user * alpha_val).astype('double')
-
-    model.fit(data_conf, show_progress=False)
+    weighting = project_template.weighting or WeightingScheme()
+    training = project_template.training or TrainingParameters()
+
+    async with progress.phase('matrix_build'):
+        confidence = apply_weighting(
+            weighting,
+            interactions['weights'],
+            interactions['user_codes'],
+            interactions['item_codes']
+        ) * weighting.alpha
+
+        sparse_user_item, sparse_item_user = build_interaction_matrices(
+            interactions['user_codes'],
+            interactions['item_codes'],
+            confidence,
+            len(users_mapping_index),
+            len(items_mapping_index)
+        )
 
-    recommendations = await get_all_recommendations(
-        project_template,
-        model,
-        no_duplicates,
-        users_mapping_index,
-        items_mapping_index,
-        sparse_user_item,
+    manifest = load_manifest(project_template.id)
+    previous_interactions = load_previous_interactions(
+        manifest,
+        subscriptions_file_info.content_hash,
         project_metadata_info
     )
 
-    await engine.get_collection(Recommendation).insert_many(recommendations, ordered=False)
+    changed_users = None
+    if previous_interactions is not None:
+        if manifest['parameters']['content_hash'] == subscriptions_file_info.content_hash:
+            changed_users = np.array([], dtype=np.int64)
+        else:
+            async with progress.phase('purchases_sync'):
+                changed_users = changed_user_ids(previous_interactions, interactions)
+                await replace_user_purchases(engine, project_template, changed_users, interactions)
+
+    recommendations_collection = engine.get_collection(Recommendation)
+
+    if incremental and changed_users is not None and \
+            manifest['parameters'].get('weighting') == weighting.doc() and \
+            manifest['factors'] == training.factors:
+        print('Incremental update: %d changed users' % len(changed_users))
+
+        touched_users = find_codes(users_mapping_index, changed_users)
+        async with progress.phase('fit'):
+            with threadpool_limits(limits=1, user_api='blas'):
+                user_factors, item_factors = update_factors(
+                    load_model(project_template.id, manifest['version']),
+                    users_mapping_index,
+                    items_mapping_index,
+                    sparse_user_item,
+                    sparse_item_user,
+                    touched_users,
+                    training.regularization,
+                    num_threads=threads
+                )
+
+        await delete_user_documents(recommendations_collection, project_template.id, changed_users)
+    else:
+        if incremental:
+            print('Incremental update is not possible, running full training')
+            await recommendations_collection.delete_many({'project': project_template.id})
+
+        initial_factors = None
+        if training.warm_start and manifest is not None:
+            initial_factors = warm_start_factors(
+                load_model(project_template.id, manifest['version']),
+                users_mapping_index,
+                items_mapping_index,
+                training.factors
+            )
+
+        model = implicit.als.AlternatingLeastSquares(
+            factors=training.factors,
+            regularization=training.regularization,
+            iterations=training.iterations if initial_factors is None else training.warm_start_iterations,
+            calculate_training_loss=False,
+            num_threads=threads
+        )
+        if initial_factors is not None:
+            print('Warm starting training from model version %s' % manifest['version'])
+            model.user_factors, model.item_factors = initial_factors
+
+        # implicit parallelises over rows itself, nested BLAS threads would only oversubscribe the budget.
+        async with progress.phase('fit'):
+            with threadpool_limits(limits=1, user_api='blas'):
+                model.fit(sparse_item_user, show_progress=False)
+
+        touched_users = None
+        user_factors, item_factors = model.user_factors, model.item_factors
+
+    async with progress.phase('similarity_index'):
+        similarity_index = build_similarity_index(item_factors)
+
+    async with progress.phase('model_save'):
+        version = save_model(
+            project_template.id,
+            user_factors,
+            item_factors,
+            users_mapping_index,
+            items_mapping_index,
+            {
+                'content_hash': subscriptions_file_info.content_hash,
+                'weighting': weighting.doc(),
+                'training': training.doc(),
+            },
+            similarity_index
+        )
+
+        if touched_users is not None:
+            save_model_array(project_template.id, version, SCORED_USERS_ARRAY, touched_users)
+            users_count = len(touched_users)
+        else:
+            users_count = len(users_mapping_index)
+
+    partitions = [
+        score_recommendations_partition.si(
+            str(project_template.id),
+            version,
+            start,
+            min(start + SCORING_PARTITION_USERS, users_count)
+        )
+        for start in range(0, users_count, SCORING_PARTITION_USERS)
+    ]
+    await progress.set(phase='score', partitions=len(partitions))
+    print('DataSet Analysis Task Ended: scoring %d users in %d partitions' % (users_count, len(partitions)))
+
+    if len(partitions) < 1:
+        await finish_analysis_async(project, change_import_bool, change_analysis_bool)
+        return
+
+    chord(partitions)(finish_analysis.si(project, change_import_bool, change_analysis_bool))
+
+
+async def score_recommendations_partition_async(project_id, version, start, end):
+    print('Scoring Partition Task Started: users %d-%d' % (start, end))
+    engine = get_engine()
+
+    model = load_model(project_id, version)
+    scored_users = load_model_array(project_id, version, SCORED_USERS_ARRAY)
+    users = np.asarray(scored_users[start:end]) if scored_users is not None else np.arange(start, end)
+
+    threads = task_thread_budget()
+    timings = {}
+    with threadpool_limits(limits=1, user_api='blas'):
+        written = await stream_recommendations(
+            engine.get_collection(Recommendation),
+            ObjectId(project_id),
+            model['user_factors'],
+            np.array(model['item_factors']),
+            model['user_index'],
+            model['item_index'],
+            users=users,
+            threads=threads,
+            timings=timings
+        )
+
+    progress = AnalysisProgress(engine, ObjectId(project_id))
+    await progress.add_durations(timings)
+    await progress.increment(scored_users=len(users), recommendations=written, finished_partitions=1)
+
+    print('Scoring Partition Task Ended: %d recommendations written' % written)
+    return written
+
+
+async def finish_analysis_async(project, change_import_bool=True, change_analysis_bool=True):
+    engine = get_engine()
+    project_template = Project.parse_doc(loads(project))
 
     if change_analysis_bool:
         project_template.analyzed = True
     if change_import_bool:
+        project_template.importing = False
         project_template.imported = True
     if change_analysis_bool or change_import_bool:
         await engine.save(project_template)
-    print('DataSet Analysis Task Ended')
+
+    await AnalysisProgress(engine, project_template.id).finish()
+    print('Analysis Finished')
+
+
+@celery_app.task(acks_late=True, max_retries=3, retry=True)
+def import_project_files(project, project_metadata):
+    run_tracked(loads(project)['_id'], import_project_files_async(project, project_metadata))
 
 
 @celery_app.task(acks_late=True, max_retries=3, retry=True)
 def import_and_analyze_purchases(
         project,
-        dataset,
+        content_hash,
         project_metadata,
         change_import_bool=True,
         change_analysis_bool=True
 ):
-    asyncio.run(
+    run_tracked(
+        loads(project)['_id'],
         import_and_analyze_purchases_async(
             project,
-            dataset,
+            content_hash,
             project_metadata,
             change_import_bool,
             change_analysis_bool
@@ -239,5 +528,18 @@ def import_and_analyze_purchases(
 
 
 @celery_app.task(acks_late=True, max_retries=3, task_reject_on_worker_lost=True, retry=True)
-def analyze_purchases(project, project_metadata_info, change_analysis_bool=True):
-    asyncio.run(analyze_purchases_async(project, project_metadata_info, None, False, change_analysis_bool))
+def analyze_purchases(project, project_metadata_info, change_analysis_bool=True, incremental=False):
+    run_tracked(
+        loads(project)['_id'],
+        analyze_purchases_async(project, project_metadata_info, None, False, change_analysis_bool, incremental)
+    )
+
+
+@celery_app.task(acks_late=True, max_retries=3, task_reject_on_worker_lost=True, retry=True)
+def score_recommendations_partition(project_id, version, start, end):
+    return run_tracked(ObjectId(project_id), score_recommendations_partition_async(project_id, version, start, end))
+
+
+@celery_app.task(acks_late=True, max_retries=3, retry=True)
+def finish_analysis(project, change_import_bool=True, change_analysis_bool=True):
+    run_tracked(loads(project)['_id'], finish_analysis_async(project, change_import_bool, change_analysis_bool))
@@ -0,0 +1,89 @@
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from implicit import _als
+from scipy import sparse
+
+INCREMENTAL_ITERATIONS = 3
+INCREMENTAL_CG_STEPS = 3
+
+
+def decode_interactions(interactions: Dict[str, np.ndarray]) -> pd.DataFrame:
+    return pd.DataFrame({
+        'user_id': np.asarray(interactions['user_index'])[np.asarray(interactions['user_codes'], dtype=np.int64)],
+        'item_id': np.asarray(interactions['item_index'])[np.asarray(interactions['item_codes'], dtype=np.int64)],
+        'weight': np.asarray(interactions['weights'], dtype=np.int64),
+    })
+
+
+def changed_user_ids(previous: Dict[str, np.ndarray], current: Dict[str, np.ndarray]) -> np.ndarray:
+    merged = decode_interactions(previous).merge(
+        decode_interactions(current),
+        on=['user_id', 'item_id'],
+        how='outer',
+        suffixes=('_previous', '_current')
+    )
+    changed = merged['weight_previous'].ne(merged['weight_current'])
+
+    return np.unique(merged.loc[changed, 'user_id'].to_numpy(dtype=np.int64))
+
+
+def align_factors(previous_index, previous_factors, current_index) -> Tuple[np.ndarray, np.ndarray]:
+    previous_index = np.asarray(previous_index)
+    current_index = np.asarray(current_index)
+
+    positions = np.searchsorted(previous_index, current_index)
+    positions[positions >= len(previous_index)] = 0
+    known = previous_index[positions] == current_index if len(previous_index) > 0 else \
+        np.zeros(len(current_index), dtype=bool)
+
+    factors = np.zeros((len(current_index), previous_factors.shape[1]), dtype=np.float32)
+    factors[known] = previous_factors[positions[known]]
+
+    return factors, known
+
+
+def solve_factors(
+        confidence: sparse.csr_matrix,
+        factors: np.ndarray,
+        fixed_factors: np.ndarray,
+        regularization: float,
+        rows: np.ndarray,
+        num_threads: int = 0,
+        cg_steps: int = INCREMENTAL_CG_STEPS
+) -> None:
+    # Runs implicit's native conjugate gradient solver on the selected rows only, updating factors in place.
+    if len(rows) == 0:
+        return
+
+    solved = np.ascontiguousarray(factors[rows])
+    _als.least_squares_cg(confidence[rows], solved, fixed_factors, regularization, num_threads, cg_steps)
+    factors[rows] = solved
+
+
+def update_factors(
+        previous_model: Dict[str, np.ndarray],
+        user_index: np.ndarray,
+        item_index: np.ndarray,
+        user_items: sparse.csr_matrix,
+        item_users: sparse.csr_matrix,
+        touched_users: np.ndarray,
+        regularization: float,
+        iterations: int = INCREMENTAL_ITERATIONS,
+        num_threads: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    user_factors, _ = align_factors(previous_model['user_index'], previous_model['user_factors'], user_index)
+    item_factors, known_items = align_factors(previous_model['item_index'], previous_model['item_factors'], item_index)
+
+    # Only items rated by a changed user see a different least squares problem; the rest keep their factors.
+    touched_items = np.union1d(np.flatnonzero(~known_items), np.unique(user_items[touched_users].indices))
+
+    solve_factors(item_users, item_factors, user_factors, regularization, touched_items, num_threads)
+    solve_factors(user_items, user_factors, item_factors, regularization, touched_users, num_threads)
+
+    for _ in range(iterations):
+        solve_factors(item_users, item_factors, user_factors, regularization, touched_items, num_threads)
+        solve_factors(user_items, user_factors, item_factors, regularization, touched_users, num_threads)
+
+    return user_factors, item_factors
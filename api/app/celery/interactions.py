@@ -0,0 +1,25 @@
+from typing import Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+def build_interaction_matrices(
+        user_codes,
+        item_codes,
+        values,
+        users_count: int,
+        items_count: int
+) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    user_items = sparse.coo_matrix(
+        (
+            np.asarray(values, dtype=np.float32),
+            (np.asarray(user_codes, dtype=np.int32), np.asarray(item_codes, dtype=np.int32))
+        ),
+        shape=(users_count, items_count)
+    ).tocsr()
+
+    # CSC of user_items and CSR of item_users share the same layout, so transposing the CSC is free.
+    item_users = user_items.tocsc().T
+
+    return user_items, item_users
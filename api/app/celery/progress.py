@@ -0,0 +1,71 @@
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from app.database.models.AnalysisStatus import AnalysisStatus
+
+
+class AnalysisProgress:
+    def __init__(self, engine, project_id):
+        self.collection = engine.get_collection(AnalysisStatus)
+        self.project_id = project_id
+
+    async def _update(self, update: dict) -> None:
+        await self.collection.update_one({'project': self.project_id}, update)
+
+    async def start(self) -> None:
+        await self.collection.replace_one(
+            {'project': self.project_id},
+            {
+                'project': self.project_id,
+                'state': 'running',
+                'phase': None,
+                'started_at': datetime.utcnow(),
+                'finished_at': None,
+                'error': None,
+                'phases': {},
+                'rows': 0,
+                'users': 0,
+                'items': 0,
+                'interactions': 0,
+                'scored_users': 0,
+                'recommendations': 0,
+                'partitions': 0,
+                'finished_partitions': 0,
+            },
+            upsert=True
+        )
+
+    async def set(self, **values) -> None:
+        await self._update({'$set': values})
+
+    async def increment(self, **values) -> None:
+        await self._update({'$inc': values})
+
+    async def add_durations(self, durations: dict) -> None:
+        await self.increment(**{'phases.' + name: float(duration) for name, duration in durations.items()})
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        await self.set(phase=name)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            await self.add_durations({name: time.perf_counter() - started_at})
+
+    async def finish(self, error: str = None) -> None:
+        await self.set(
+            state='failed' if error is not None else 'finished',
+            phase=None,
+            finished_at=datetime.utcnow(),
+            error=error
+        )
+
+
+async def track_failures(engine, project_id, coroutine):
+    try:
+        return await coroutine
+    except Exception as error:
+        await AnalysisProgress(engine, project_id).finish(repr(error))
+        raise
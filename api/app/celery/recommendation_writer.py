@@ -0,0 +1,125 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from app.celery.scoring import top_n_block, get_user_item_weights, scoring_block_size
+
+RECOMMENDATION_BATCH_SIZE = 10000
+WRITER_CONCURRENCY = 4
+
+
+def recommendation_documents(project_id, user_ids, item_ids, scores, user_item_weights) -> List[dict]:
+    return [
+        {
+            'user_id': user_id,
+            'project': project_id,
+            'item_id': item_id,
+            'score': score,
+            'user_item_weight': user_item_weight,
+        }
+        for user_id, item_id, score, user_item_weight in zip(
+            user_ids.tolist(),
+            item_ids.tolist(),
+            scores.tolist(),
+            user_item_weights.tolist()
+        )
+    ]
+
+
+async def put_or_fail(queue: asyncio.Queue, item, writers) -> None:
+    put = asyncio.ensure_future(queue.put(item))
+    done, _ = await asyncio.wait([put] + writers, return_when=asyncio.FIRST_COMPLETED)
+
+    if put not in done:
+        put.cancel()
+        for writer in writers:
+            if writer.done():
+                writer.result()
+
+
+async def stream_recommendations(
+        collection,
+        project_id,
+        user_factors: np.ndarray,
+        item_factors: np.ndarray,
+        user_index: np.ndarray,
+        item_index: np.ndarray,
+        n: int = 10,
+        users: np.ndarray = None,
+        threads: int = None,
+        concurrency: int = WRITER_CONCURRENCY,
+        timings: Dict[str, float] = None
+) -> int:
+    loop = asyncio.get_event_loop()
+    threads = threads or os.cpu_count()
+    user_index = np.asarray(user_index)
+    item_index = np.asarray(item_index)
+
+    if users is None:
+        users = np.arange(user_factors.shape[0])
+
+    n = min(n, item_factors.shape[0])
+    block_size = min(scoring_block_size(item_factors.shape[0]), max(1, RECOMMENDATION_BATCH_SIZE // max(n, 1)))
+
+    timings = timings if timings is not None else {}
+    timings.setdefault('score', 0.0)
+    timings.setdefault('write', 0.0)
+
+    def build_batch(block_users):
+        started_at = time.perf_counter()
+        items, scores = top_n_block(user_factors[block_users], item_factors, n)
+        scores = scores.ravel()
+        documents = recommendation_documents(
+            project_id,
+            user_index[np.repeat(block_users, n)],
+            item_index[items.ravel()],
+            scores,
+            get_user_item_weights(scores)
+        )
+        return documents, time.perf_counter() - started_at
+
+    queue = asyncio.Queue(maxsize=concurrency)
+    written = 0
+
+    async def writer():
+        nonlocal written
+        while True:
+            documents = await queue.get()
+            if documents is None:
+                return
+            started_at = time.perf_counter()
+            await collection.insert_many(documents, ordered=False)
+            timings['write'] += time.perf_counter() - started_at
+            written += len(documents)
+
+    async def collect_batch(batch):
+        documents, elapsed = await batch
+        timings['score'] += elapsed
+        return documents
+
+    writers = [asyncio.ensure_future(writer()) for _ in range(concurrency)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            pending = deque()
+            for start in range(0, len(users), block_size):
+                pending.append(loop.run_in_executor(executor, build_batch, users[start:start + block_size]))
+                if len(pending) >= threads:
+                    await put_or_fail(queue, await collect_batch(pending.popleft()), writers)
+
+            while len(pending) > 0:
+                await put_or_fail(queue, await collect_batch(pending.popleft()), writers)
+
+        for _ in writers:
+            await put_or_fail(queue, None, writers)
+        await asyncio.gather(*writers)
+    finally:
+        for writer in writers:
+            writer.cancel()
+
+    return written
@@ -0,0 +1,14 @@
+import os
+
+from app.celery.celery_app import celery_app
+
+
+def available_cpus() -> int:
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def task_thread_budget() -> int:
+    concurrency = celery_app.conf.worker_concurrency or available_cpus()
+    return max(1, available_cpus() // concurrency)
@@ -0,0 +1,28 @@
+from typing import Tuple
+
+import numpy as np
+
+SCORING_BLOCK_ELEMENTS = 2 ** 24
+USER_ITEM_WEIGHT_BINS = [0.019, 0.04, 0.49, 1]
+
+
+def scoring_block_size(items_count: int) -> int:
+    return max(1, SCORING_BLOCK_ELEMENTS // max(items_count, 1))
+
+
+def top_n_block(user_factors: np.ndarray, item_factors: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    scores = user_factors.dot(item_factors.T)
+
+    if n < scores.shape[1]:
+        candidates = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def get_user_item_weights(scores: np.ndarray) -> np.ndarray:
+    return np.digitize(scores, USER_ITEM_WEIGHT_BINS) + 1
@@ -0,0 +1,38 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.celery.incremental import align_factors
+from app.database.models.TrainingParameters import TrainingParameters
+
+INITIAL_FACTORS_SCALE = 0.01
+
+
+def is_valid_training_parameters(parameters: TrainingParameters) -> bool:
+    return parameters.factors > 0 and \
+        parameters.iterations > 0 and \
+        parameters.warm_start_iterations > 0 and \
+        parameters.regularization >= 0
+
+
+def warm_start_factors(
+        previous_model: Optional[Dict[str, np.ndarray]],
+        user_index: np.ndarray,
+        item_index: np.ndarray,
+        factors: int
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    if previous_model is None or previous_model['item_factors'].shape[1] != factors:
+        return None
+
+    random = np.random.default_rng()
+    warm_factors = []
+
+    for index_name, factors_name, index in (
+            ('user_index', 'user_factors', user_index),
+            ('item_index', 'item_factors', item_index)
+    ):
+        aligned, known = align_factors(previous_model[index_name], previous_model[factors_name], index)
+        aligned[~known] = random.random((int((~known).sum()), factors), dtype=np.float32) * INITIAL_FACTORS_SCALE
+        warm_factors.append(aligned)
+
+    return warm_factors[0], warm_factors[1]
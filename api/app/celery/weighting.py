@@ -0,0 +1,55 @@
+import numpy as np
+
+from app.database.models.WeightingScheme import WeightingScheme
+
+
+def bucketed_weight(scheme: WeightingScheme, weights, user_codes, item_codes) -> np.ndarray:
+    return (np.digitize(weights, scheme.bins) + 1).astype(np.float64)
+
+
+def log_weight(scheme: WeightingScheme, weights, user_codes, item_codes) -> np.ndarray:
+    return np.log1p(np.asarray(weights, dtype=np.float64) / scheme.epsilon)
+
+
+def linear_weight(scheme: WeightingScheme, weights, user_codes, item_codes) -> np.ndarray:
+    return np.asarray(weights, dtype=np.float64)
+
+
+def inverse_user_frequency(user_codes, item_codes) -> np.ndarray:
+    users_count = float(user_codes.max() + 1) if len(user_codes) > 0 else 1.0
+    return np.log((1.0 + users_count) / (1.0 + np.bincount(item_codes))) + 1.0
+
+
+def bm25_weight(scheme: WeightingScheme, weights, user_codes, item_codes) -> np.ndarray:
+    weights = np.asarray(weights, dtype=np.float64)
+    idf = inverse_user_frequency(user_codes, item_codes)
+
+    user_lengths = np.bincount(user_codes, weights=weights)
+    length_norm = (1.0 - scheme.b) + scheme.b * user_lengths / user_lengths.mean()
+
+    return weights * (scheme.k1 + 1.0) / (scheme.k1 * length_norm[user_codes] + weights) * idf[item_codes]
+
+
+def tfidf_weight(scheme: WeightingScheme, weights, user_codes, item_codes) -> np.ndarray:
+    idf = inverse_user_frequency(user_codes, item_codes)
+
+    return np.sqrt(np.asarray(weights, dtype=np.float64)) * idf[item_codes]
+
+
+WEIGHTING_SCHEMES = {
+    'bucketed': bucketed_weight,
+    'log': log_weight,
+    'linear': linear_weight,
+    'bm25': bm25_weight,
+    'tfidf': tfidf_weight,
+}
+
+
+def apply_weighting(scheme: WeightingScheme, weights, user_codes, item_codes) -> np.ndarray:
+    return WEIGHTING_SCHEMES[scheme.scheme](scheme, weights, np.asarray(user_codes), np.asarray(item_codes))
+
+
+def is_valid_weighting(scheme: WeightingScheme) -> bool:
+    return scheme.scheme in WEIGHTING_SCHEMES and \
+        list(scheme.bins) == sorted(scheme.bins) and \
+        scheme.epsilon > 0 and scheme.alpha > 0
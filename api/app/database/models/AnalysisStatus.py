@@ -0,0 +1,26 @@
+from abc import ABC
+from datetime import datetime
+from typing import Dict, Optional
+
+from odmantic import Model, ObjectId
+
+
+class AnalysisStatus(Model, ABC):
+    project: ObjectId
+    state: str = 'running'
+    phase: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    phases: Dict[str, float] = {}
+    rows: int = 0
+    users: int = 0
+    items: int = 0
+    interactions: int = 0
+    scored_users: int = 0
+    recommendations: int = 0
+    partitions: int = 0
+    finished_partitions: int = 0
+
+    class Config:
+        collection = "analysis_statuses"
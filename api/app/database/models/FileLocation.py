@@ -1,4 +1,5 @@
 from abc import ABC
+from typing import Optional
 
 from odmantic import Model
 
@@ -7,6 +8,8 @@ class FileLocation(Model, ABC):
     name: str
     location: str
     file_type: str
+    content_hash: Optional[str] = None
+    size: Optional[int] = None
 
     class Config:
         collection = "file_locations"
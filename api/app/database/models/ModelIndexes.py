@@ -0,0 +1,65 @@
+from typing import NamedTuple, Tuple, Type
+
+from odmantic import Model
+from pymongo import ASCENDING, IndexModel
+
+from app.database.models.AnalysisStatus import AnalysisStatus
+from app.database.models.Metadata import Metadata
+from app.database.models.Purchase import Purchase
+from app.database.models.Recommendation import Recommendation
+from app.database.models.User import User
+
+
+class ModelIndex(NamedTuple):
+    model: Type[Model]
+    keys: Tuple[Tuple[str, int], ...]
+
+    def index_model(self) -> IndexModel:
+        return IndexModel(list(self.keys))
+
+
+MODEL_INDEXES = (
+    # Purchases list, search and keyset pages, plus per-user deletes of incremental imports.
+    ModelIndex(Purchase, (('project', ASCENDING), ('user_id', ASCENDING), ('_id', ASCENDING))),
+    ModelIndex(Purchase, (('project', ASCENDING), ('purchase_id', ASCENDING), ('_id', ASCENDING))),
+    ModelIndex(Purchase, (('project', ASCENDING), ('weight', ASCENDING), ('_id', ASCENDING))),
+    # Recommendation lists and connections filter on project plus optionally item_id and/or user_item_weight,
+    # then sort on user_id, user_item_weight, score or item_id with _id as tiebreak. Every filter and sort
+    # combination gets an index with the equality fields first and the sort fields after them, so no page
+    # needs a blocking in-memory sort. Combinations where the sort field is itself an equality field reduce
+    # to the (..., _id) index of that filter. The per-user index also serves per-user deletes.
+    ModelIndex(Recommendation, (('project', ASCENDING), ('user_id', ASCENDING), ('_id', ASCENDING))),
+    ModelIndex(Recommendation, (('project', ASCENDING), ('user_item_weight', ASCENDING), ('_id', ASCENDING))),
+    ModelIndex(Recommendation, (('project', ASCENDING), ('score', ASCENDING), ('_id', ASCENDING))),
+    ModelIndex(Recommendation, (('project', ASCENDING), ('item_id', ASCENDING), ('_id', ASCENDING))),
+    ModelIndex(Recommendation, (
+        ('project', ASCENDING), ('item_id', ASCENDING), ('user_id', ASCENDING), ('_id', ASCENDING)
+    )),
+    ModelIndex(Recommendation, (
+        ('project', ASCENDING), ('item_id', ASCENDING), ('user_item_weight', ASCENDING), ('_id', ASCENDING)
+    )),
+    ModelIndex(Recommendation, (
+        ('project', ASCENDING), ('item_id', ASCENDING), ('score', ASCENDING), ('_id', ASCENDING)
+    )),
+    ModelIndex(Recommendation, (
+        ('project', ASCENDING), ('user_item_weight', ASCENDING), ('user_id', ASCENDING), ('_id', ASCENDING)
+    )),
+    ModelIndex(Recommendation, (
+        ('project', ASCENDING), ('user_item_weight', ASCENDING), ('score', ASCENDING), ('_id', ASCENDING)
+    )),
+    ModelIndex(Recommendation, (
+        ('project', ASCENDING), ('user_item_weight', ASCENDING), ('item_id', ASCENDING), ('_id', ASCENDING)
+    )),
+    # Item and stars together; the score index also keeps the per-item statistics histogram covered.
+    ModelIndex(Recommendation, (
+        ('project', ASCENDING), ('item_id', ASCENDING), ('user_item_weight', ASCENDING), ('user_id', ASCENDING),
+        ('_id', ASCENDING)
+    )),
+    ModelIndex(Recommendation, (
+        ('project', ASCENDING), ('item_id', ASCENDING), ('user_item_weight', ASCENDING), ('score', ASCENDING),
+        ('_id', ASCENDING)
+    )),
+    ModelIndex(Metadata, (('project', ASCENDING), ('meta_id', ASCENDING))),
+    ModelIndex(AnalysisStatus, (('project', ASCENDING),)),
+    ModelIndex(User, (('email', ASCENDING),)),
+)
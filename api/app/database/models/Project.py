@@ -1,17 +1,22 @@
-from typing import List
+from typing import List, Optional
 from abc import ABC
 from odmantic import Model, ObjectId
 
 from app.database.models.FileLocation import FileLocation
+from app.database.models.TrainingParameters import TrainingParameters
+from app.database.models.WeightingScheme import WeightingScheme
 
 
 class Project(Model, ABC):
     name: str
+    importing: bool = False
     imported: bool = False
     analyzed: bool = False
     deleted: bool = False
     files: List[FileLocation]
     allowed_users: List[ObjectId] = []
+    weighting: Optional[WeightingScheme] = None
+    training: Optional[TrainingParameters] = None
 
     class Config:
         collection = "projects"
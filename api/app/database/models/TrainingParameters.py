@@ -0,0 +1,11 @@
+from abc import ABC
+
+from odmantic import EmbeddedModel
+
+
+class TrainingParameters(EmbeddedModel, ABC):
+    factors: int = 140
+    regularization: float = 0.1
+    iterations: int = 40
+    warm_start: bool = False
+    warm_start_iterations: int = 10
@@ -0,0 +1,13 @@
+from abc import ABC
+from typing import List
+
+from odmantic import EmbeddedModel
+
+
+class WeightingScheme(EmbeddedModel, ABC):
+    scheme: str = 'bucketed'
+    alpha: float = 40.0
+    bins: List[float] = [2, 5, 10, 20]
+    epsilon: float = 1.0
+    k1: float = 100.0
+    b: float = 0.8
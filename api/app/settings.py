@@ -53,6 +53,9 @@ CORS_ORIGINS = [
 # Uploaded files
 UPLOAD_FILE_PATH = '/app/uploads/'
 
+# Trained model factors kept in memory by the API process
+FACTORS_CACHE_MAX_BYTES = int(os.getenv("FACTORS_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
 
 class JWTSettings(BaseModel):
     authjwt_secret_key: str = os.getenv("JWT_SECRET")
@@ -3,6 +3,7 @@ from odmantic import AIOEngine
 
 from app import settings
 from app.api.utils.AuthUtils import create_admin_user, AccessLevelExists, create_default_access_levels
+from app.api.utils.IndexUtils import apply_indexes
 from app.database.database import db
 from app.database.models.Purchase import Purchase
 from app.logger import logger
@@ -27,6 +28,11 @@ async def preflight_setup():
         await create_default_access_levels()
     except AccessLevelExists:
         logger.info('Default access levels exist, continuing...')
+
+    created_indexes, unindexed_queries = await apply_indexes(engine)
+    logger.info('Indexes ensured: %s', ', '.join(created_indexes))
+    if len(unindexed_queries) > 0:
+        logger.warning('Queries without an index-backed plan: %s', ', '.join(unindexed_queries))
     
     logger.info("Initial setup completed successfully!")
 
@@ -0,0 +1,71 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.api.utils.DatasetUtils import PurchasesAggregator  # noqa: E402
+
+CHUNK_SIZE = 10 ** 6
+
+
+def generate_subscriptions_file(path, rows, users, items, seed=0):
+    random = np.random.default_rng(seed)
+    written = 0
+    header = True
+
+    while written < rows:
+        size = min(CHUNK_SIZE, rows - written)
+        pd.DataFrame({
+            'user_id': random.integers(0, users, size),
+            'meta_id': random.integers(0, items, size),
+            'start_at': '2021-01-01',
+            'end_at': '2021-02-01',
+        }).to_csv(path, mode='a', header=header, index=False)
+        header = False
+        written += size
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming subscriptions aggregation benchmark')
+    parser.add_argument('--rows', type=int, default=50 * 10 ** 6)
+    parser.add_argument('--users', type=int, default=250000)
+    parser.add_argument('--items', type=int, default=40)
+    parser.add_argument('--path', default=None)
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.gettempdir(), 'subscriptions_%d.csv' % args.rows)
+    if not os.path.exists(path):
+        started_at = time.perf_counter()
+        generate_subscriptions_file(path, args.rows, args.users, args.items)
+        print('Generated %s in %.1fs' % (path, time.perf_counter() - started_at))
+
+    rss_before = peak_rss_mb()
+    started_at = time.perf_counter()
+
+    aggregator = PurchasesAggregator()
+    with pd.read_csv(path, chunksize=CHUNK_SIZE, usecols=['user_id', 'meta_id']) as reader:
+        for chunk in reader:
+            aggregator.add(chunk['user_id'].to_numpy(), chunk['meta_id'].to_numpy())
+    user_ids, item_ids, weights = aggregator.result()
+
+    elapsed = time.perf_counter() - started_at
+
+    assert int(weights.sum()) == aggregator.total_rows
+    print('Rows: %d, distinct pairs: %d' % (aggregator.total_rows, len(weights)))
+    print('Wall time: %.1fs (%.0f rows/s)' % (elapsed, aggregator.total_rows / elapsed))
+    print('Peak RSS: %.0f MB (%.0f MB before aggregation)' % (peak_rss_mb(), rss_before))
+
+
+if __name__ == '__main__':
+    main()
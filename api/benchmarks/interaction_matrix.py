@@ -0,0 +1,125 @@
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.api.utils.DatasetUtils import PurchasesAggregator, encode_interactions  # noqa: E402
+from app.celery.interactions import build_interaction_matrices  # noqa: E402
+from app.celery.weighting import apply_weighting  # noqa: E402
+from app.database.models.WeightingScheme import WeightingScheme  # noqa: E402
+
+
+def generate_subscriptions(rows, users, items, seed=0):
+    random = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'user_id': random.integers(0, users, rows),
+        'meta_id': random.integers(0, items, rows),
+    })
+
+
+def set_normalized_weight(x):
+    normalized_weight = 1
+
+    if x > 1:
+        normalized_weight = 2
+    if x >= 5:
+        normalized_weight = 3
+    if x >= 10:
+        normalized_weight = 4
+    if x >= 20:
+        normalized_weight = 5
+
+    return normalized_weight
+
+
+def build_baseline(frame):
+    no_duplicates = frame.pivot_table(index=['user_id', 'meta_id'], aggfunc='size').reset_index() \
+        .rename(columns={0: 'weight'})
+    no_duplicates['normalized_weight'] = no_duplicates['weight'].apply(lambda x: set_normalized_weight(x))
+    no_duplicates['user_id_code'], _ = pd.Series(no_duplicates['user_id']).factorize()
+    no_duplicates['meta_id_code'], _ = pd.Series(no_duplicates['meta_id']).factorize()
+
+    item_users = sparse.csr_matrix((
+        no_duplicates['normalized_weight'].astype(float),
+        (no_duplicates['meta_id_code'], no_duplicates['user_id_code'])
+    ))
+    user_items = item_users.T.tocsr()
+    data_conf = (item_users * 40).astype('double')
+
+    return user_items, data_conf
+
+
+def build_direct(frame):
+    aggregator = PurchasesAggregator()
+    aggregator.add(frame['user_id'].to_numpy(), frame['meta_id'].to_numpy())
+    interactions = encode_interactions(*aggregator.result())
+
+    weighting = WeightingScheme()
+    confidence = apply_weighting(
+        weighting,
+        interactions['weights'],
+        interactions['user_codes'],
+        interactions['item_codes']
+    ) * weighting.alpha
+
+    return build_interaction_matrices(
+        interactions['user_codes'],
+        interactions['item_codes'],
+        confidence,
+        len(interactions['user_index']),
+        len(interactions['item_index'])
+    )
+
+
+BUILDERS = {
+    'baseline': build_baseline,
+    'direct': build_direct,
+}
+
+
+def run_builder(name, rows, users, items):
+    frame = generate_subscriptions(rows, users, items)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    started_at = time.perf_counter()
+    user_items, item_users = BUILDERS[name](frame)
+    elapsed = time.perf_counter() - started_at
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print('%-9s nnz=%d wall=%.1fs peak_rss=%.0fMB (input %.0fMB)' % (
+        name, user_items.nnz, elapsed, peak_rss, rss_before
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Interaction matrix build benchmark')
+    parser.add_argument('--rows', type=int, default=10 ** 7)
+    parser.add_argument('--users', type=int, default=250000)
+    parser.add_argument('--items', type=int, default=40)
+    parser.add_argument('--builder', choices=BUILDERS.keys(), default=None)
+    args = parser.parse_args()
+
+    if args.builder is not None:
+        run_builder(args.builder, args.rows, args.users, args.items)
+        return
+
+    for name in BUILDERS:
+        subprocess.run([
+            sys.executable, os.path.abspath(__file__),
+            '--rows', str(args.rows),
+            '--users', str(args.users),
+            '--items', str(args.items),
+            '--builder', name
+        ], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.api.utils.StatisticsUtils import star_histogram, STAR_RATINGS  # noqa: E402
+
+INSERT_BATCH_SIZE = 100000
+
+
+async def seed(collection, project_id, documents, users, items):
+    random = np.random.default_rng(0)
+    await collection.drop()
+
+    for start in range(0, documents, INSERT_BATCH_SIZE):
+        size = min(INSERT_BATCH_SIZE, documents - start)
+        await collection.insert_many([
+            {
+                'user_id': user_id,
+                'project': project_id,
+                'item_id': item_id,
+                'score': score,
+                'user_item_weight': weight,
+            }
+            for user_id, item_id, score, weight in zip(
+                random.integers(0, users, size).tolist(),
+                random.integers(0, items, size).tolist(),
+                random.random(size).tolist(),
+                random.integers(1, 6, size).tolist()
+            )
+        ], ordered=False)
+
+    await collection.create_index([('project', 1), ('item_id', 1), ('user_item_weight', 1)])
+    await collection.create_index([('project', 1), ('user_item_weight', 1)])
+
+
+async def counts_baseline(collection, project_id, item_id):
+    query = {'project': project_id}
+    if item_id is not None:
+        query['item_id'] = item_id
+
+    histogram = {'total': await collection.count_documents(query)}
+    for stars in STAR_RATINGS:
+        histogram[stars] = await collection.count_documents(dict(query, user_item_weight=stars))
+
+    return histogram
+
+
+async def aggregation(collection, project_id, item_id):
+    return await star_histogram(collection, project_id, item_id)
+
+
+async def measure(name, run, repeats):
+    durations = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        await run()
+        durations.append(time.perf_counter() - started_at)
+
+    print('%-12s p50=%.1fms min=%.1fms' % (name, np.percentile(durations, 50) * 1000, min(durations) * 1000))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Project statistics benchmark')
+    parser.add_argument('--uri', default='mongodb://localhost:27017')
+    parser.add_argument('--database', default='recommdo_benchmark')
+    parser.add_argument('--documents', type=int, default=50 * 10 ** 6)
+    parser.add_argument('--users', type=int, default=5 * 10 ** 6)
+    parser.add_argument('--items', type=int, default=40)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', action='store_true')
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.uri)
+    collection = client[args.database]['recommendations']
+    project_id = ObjectId('000000000000000000000001')
+
+    if args.seed:
+        started_at = time.perf_counter()
+        await seed(collection, project_id, args.documents, args.users, args.items)
+        print('Seeded %d documents in %.1fs' % (args.documents, time.perf_counter() - started_at))
+
+    for item_id in (None, 0):
+        print('item_id=%s' % item_id)
+        await measure('six counts', lambda: counts_baseline(collection, project_id, item_id), args.repeats)
+        await measure('aggregation', lambda: aggregation(collection, project_id, item_id), args.repeats)
+
+    client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
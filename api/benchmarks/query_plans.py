@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from odmantic import AIOEngine, ObjectId  # noqa: E402
+
+from app import settings  # noqa: E402
+from app.api.utils.IndexUtils import ensure_indexes, explain_resolver_queries, unindexed_queries  # noqa: E402
+
+
+async def check_plans(project_id, create):
+    client = AsyncIOMotorClient(
+        host=settings.DATABASE_HOST,
+        port=int(settings.DATABASE_PORT),
+        username=settings.DATABASE_USERNAME,
+        password=settings.DATABASE_PASSWORD
+    )
+    engine = AIOEngine(motor_client=client, database=settings.DATABASE_NAME)
+
+    try:
+        if create:
+            await ensure_indexes(engine)
+
+        shapes, plans = await explain_resolver_queries(engine, project_id)
+    finally:
+        client.close()
+
+    for name, stages in plans.items():
+        print('%-70s %s' % (name, ' <- '.join(stages)))
+
+    return unindexed_queries(shapes, plans)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolver query plan check')
+    parser.add_argument('--project', default=None)
+    parser.add_argument('--no-create', action='store_true')
+    args = parser.parse_args()
+
+    unindexed = asyncio.run(check_plans(ObjectId(args.project) if args.project else None, not args.no_create))
+    if len(unindexed) > 0:
+        print('Queries without an index-backed plan: %s' % ', '.join(unindexed))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
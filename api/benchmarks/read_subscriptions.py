@@ -0,0 +1,103 @@
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.api.utils.CsvUtils import read_subscriptions_csv, downcast_ids, CSV_CHUNK_SIZE, ID_DTYPE  # noqa: E402
+from benchmarks.aggregate_subscriptions import generate_subscriptions_file  # noqa: E402
+
+PROJECT_METADATA = {
+    'subscriptions_user_id_header': 'user_id',
+    'subscriptions_meta_id_header': 'meta_id',
+    'subscriptions_start_from_header': 'start_at',
+    'subscriptions_end_at_header': 'end_at',
+}
+
+
+def read_baseline(path):
+    return len(pd.read_csv(path))
+
+
+def read_baseline_chunked(path):
+    rows = 0
+    with pd.read_csv(path, chunksize=10 ** 6, encoding='utf8') as reader:
+        for chunk in reader:
+            rows += len(chunk)
+    return rows
+
+
+def read_schema(path):
+    rows = 0
+    for chunk in read_subscriptions_csv(path, PROJECT_METADATA):
+        rows += len(chunk)
+    return rows
+
+
+def read_schema_with_dates(path):
+    # The app only reads the id columns; this measures the extra cost of also parsing the date columns.
+    id_columns = [
+        PROJECT_METADATA['subscriptions_user_id_header'],
+        PROJECT_METADATA['subscriptions_meta_id_header'],
+    ]
+    date_columns = [
+        PROJECT_METADATA['subscriptions_start_from_header'],
+        PROJECT_METADATA['subscriptions_end_at_header'],
+    ]
+
+    rows = 0
+    with pd.read_csv(
+            path,
+            chunksize=CSV_CHUNK_SIZE,
+            encoding='utf8',
+            usecols=id_columns + date_columns,
+            dtype={column: ID_DTYPE for column in id_columns},
+            parse_dates=date_columns
+    ) as reader:
+        for chunk in reader:
+            rows += len(downcast_ids(chunk, id_columns))
+    return rows
+
+
+READERS = {
+    'baseline': read_baseline,
+    'baseline_chunked': read_baseline_chunked,
+    'schema': read_schema,
+    'schema_with_dates': read_schema_with_dates,
+}
+
+
+def run_reader(name, path):
+    started_at = time.perf_counter()
+    rows = READERS[name](path)
+    elapsed = time.perf_counter() - started_at
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print('%-18s rows=%d wall=%.1fs peak_rss=%.0fMB' % (name, rows, elapsed, peak_rss))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Subscriptions CSV reader benchmark')
+    parser.add_argument('--rows', type=int, default=10 ** 7)
+    parser.add_argument('--path', default=None)
+    parser.add_argument('--reader', choices=READERS.keys(), default=None)
+    args = parser.parse_args()
+
+    path = args.path or '/tmp/subscriptions_%d.csv' % args.rows
+    if not os.path.exists(path):
+        generate_subscriptions_file(path, args.rows, 250000, 40)
+
+    if args.reader is not None:
+        run_reader(args.reader, path)
+        return
+
+    for name in READERS:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--path', path, '--reader', name], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.api.utils.SimilarityUtils import build_similarity_index, similar_items, SIMILARITY_PROBES  # noqa: E402
+
+
+def generate_item_factors(items, factors, clusters, seed=0):
+    random = np.random.default_rng(seed)
+    centers = random.normal(size=(clusters, factors))
+    return (centers[random.integers(0, clusters, items)] + random.normal(scale=0.5, size=(items, factors))) \
+        .astype(np.float32)
+
+
+def measure(factors, item_ids, n, probes):
+    latencies = []
+    results = []
+
+    for item_id in item_ids:
+        started_at = time.perf_counter()
+        found, _ = similar_items(factors, item_id, n, probes)
+        latencies.append(time.perf_counter() - started_at)
+        results.append(set(found.tolist()))
+
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Similar items index benchmark')
+    parser.add_argument('--items', type=int, default=10 ** 6)
+    parser.add_argument('--factors', type=int, default=140)
+    parser.add_argument('--clusters', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--n', type=int, default=10)
+    parser.add_argument('--probes', type=int, default=SIMILARITY_PROBES)
+    args = parser.parse_args()
+
+    item_factors = generate_item_factors(args.items, args.factors, args.clusters)
+    item_index = np.arange(args.items, dtype=np.int64)
+
+    started_at = time.perf_counter()
+    index = build_similarity_index(item_factors)
+    print('Index build: %.1fs, %d lists' % (time.perf_counter() - started_at, len(index['similarity_centroids'])))
+
+    exact = {'item_factors': item_factors, 'item_index': item_index}
+    approximate = dict(exact, **index)
+
+    queries = np.random.default_rng(1).choice(args.items, args.queries, replace=False)
+    exact_latencies, exact_results = measure(exact, queries, args.n, args.probes)
+    approximate_latencies, approximate_results = measure(approximate, queries, args.n, args.probes)
+
+    recall = np.mean([
+        len(found & expected) / len(expected) for found, expected in zip(approximate_results, exact_results)
+    ])
+
+    for name, latencies in (('exact', exact_latencies), ('index', approximate_latencies)):
+        print('%-6s p50=%.3fms p99=%.3fms' % (name, np.percentile(latencies, 50), np.percentile(latencies, 99)))
+    print('Recall@%d: %.3f' % (args.n, recall))
+
+
+if __name__ == '__main__':
+    main()
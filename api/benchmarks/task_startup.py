@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import settings  # noqa: E402
+from app.celery.celery_worker import create_motor_client, run_in_worker_loop, shutdown_worker_process, \
+    worker_context  # noqa: E402
+
+
+async def first_query(client):
+    await client[settings.DATABASE_NAME]['projects'].find_one({})
+
+
+def run_per_task_client():
+    # Previous behaviour: a fresh loop and a fresh, never closed client for every task.
+    async def task():
+        client = create_motor_client(asyncio.get_event_loop())
+        await first_query(client)
+        return client
+
+    return asyncio.run(task())
+
+
+def run_shared_client():
+    async def task():
+        await first_query(worker_context.client)
+
+    run_in_worker_loop(task())
+
+
+def measure(name, run, tasks):
+    durations = []
+    for _ in range(tasks):
+        started_at = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - started_at)
+
+    durations = np.array(durations) * 1000
+    print('%-10s first=%.1fms p50=%.1fms p99=%.1fms' % (
+        name, durations[0], np.percentile(durations, 50), np.percentile(durations, 99)
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Celery task startup overhead benchmark')
+    parser.add_argument('--tasks', type=int, default=50)
+    args = parser.parse_args()
+
+    leaked_clients = []
+    measure('per_task', lambda: leaked_clients.append(run_per_task_client()), args.tasks)
+    print('per_task   clients left open: %d' % len(leaked_clients))
+
+    measure('shared', run_shared_client, args.tasks)
+    shutdown_worker_process()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Settings are read from the environment at import time; tests never reach Mongo or Redis.
+os.environ.setdefault('DATABASE_HOST', 'localhost')
+os.environ.setdefault('DATABASE_PORT', '27017')
+os.environ.setdefault('DATABASE_NAME', 'recommdo_test')
+os.environ.setdefault('REDIS_PASSWORD', 'test')
+os.environ.setdefault('JWT_SECRET', 'test')
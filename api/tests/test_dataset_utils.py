@@ -0,0 +1,62 @@
+import numpy as np
+
+from app.api.utils.DatasetUtils import PurchasesAggregator, aggregate_subscriptions_file, open_interactions_cache, \
+    save_interactions_cache
+
+PROJECT_METADATA = {
+    'subscriptions_user_id_header': 'user_id',
+    'subscriptions_meta_id_header': 'meta_id',
+    'subscriptions_start_from_header': 'start_at',
+    'subscriptions_end_at_header': 'end_at',
+}
+
+
+def test_aggregator_sums_weights_across_chunks():
+    aggregator = PurchasesAggregator(compact_threshold=1)
+    aggregator.add([1, 1, 2], [5, 5, 6])
+    aggregator.add([2, 3], [6, 5])
+
+    user_ids, item_ids, weights = aggregator.result()
+    totals = {(user_id, item_id): weight for user_id, item_id, weight in zip(user_ids, item_ids, weights)}
+
+    assert totals == {(1, 5): 2, (2, 6): 2, (3, 5): 1}
+    assert aggregator.total_rows == 5
+
+
+def test_aggregator_ignores_empty_chunks():
+    aggregator = PurchasesAggregator(compact_threshold=1)
+    aggregator.add(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    aggregator.add([1], [5])
+    aggregator.add(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    user_ids, item_ids, weights = aggregator.result()
+
+    assert user_ids.tolist() == [1]
+    assert item_ids.tolist() == [5]
+    assert weights.tolist() == [1]
+
+
+def test_aggregate_header_only_subscriptions_file(tmp_path):
+    location = tmp_path / 'subscriptions.csv'
+    location.write_text('user_id,meta_id,start_at,end_at\n')
+
+    stats = {}
+    user_ids, item_ids, weights = aggregate_subscriptions_file(str(location), PROJECT_METADATA, stats)
+
+    assert len(user_ids) == 0
+    assert len(item_ids) == 0
+    assert len(weights) == 0
+    assert stats['rows'] == 0
+
+
+def test_interactions_cache_round_trip(tmp_path):
+    cache_path = tmp_path / 'interactions'
+    save_interactions_cache(cache_path, np.array([10, 10, 20]), np.array([7, 8, 7]), np.array([1, 3, 2]))
+
+    interactions = open_interactions_cache(cache_path)
+    user_ids = interactions['user_index'][interactions['user_codes']]
+    item_ids = interactions['item_index'][interactions['item_codes']]
+
+    assert list(zip(user_ids.tolist(), item_ids.tolist(), interactions['weights'].tolist())) == [
+        (10, 7, 1), (10, 8, 3), (20, 7, 2)
+    ]
@@ -0,0 +1,40 @@
+import hashlib
+import io
+
+import pytest
+
+from app.api.utils.FileUtils import copy_with_checksum
+
+
+class FailingSource(io.BytesIO):
+    def read(self, size=-1):
+        chunk = super().read(4)
+        if not chunk:
+            raise OSError('connection dropped')
+        return chunk
+
+
+def test_copy_replaces_destination_atomically(tmp_path):
+    destination = tmp_path / 'subscriptions.csv'
+    destination.write_bytes(b'old contents')
+
+    with destination.open('rb') as reader:
+        content_hash, size = copy_with_checksum(io.BytesIO(b'new contents'), destination)
+        # A reader that opened the file before the upload keeps reading the complete previous version.
+        assert reader.read() == b'old contents'
+
+    assert destination.read_bytes() == b'new contents'
+    assert content_hash == hashlib.sha256(b'new contents').hexdigest()
+    assert size == len(b'new contents')
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['subscriptions.csv']
+
+
+def test_failed_copy_keeps_previous_file(tmp_path):
+    destination = tmp_path / 'subscriptions.csv'
+    destination.write_bytes(b'old contents')
+
+    with pytest.raises(OSError):
+        copy_with_checksum(FailingSource(b'partial upload'), destination)
+
+    assert destination.read_bytes() == b'old contents'
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['subscriptions.csv']
@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.celery.incremental import update_factors
+from app.celery.interactions import build_interaction_matrices
+
+REGULARIZATION = 0.1
+
+
+def random_model(users, items, factors, seed=0):
+    random = np.random.default_rng(seed)
+    return {
+        'user_index': np.arange(users, dtype=np.int64),
+        'item_index': np.arange(items, dtype=np.int64),
+        'user_factors': random.normal(scale=0.1, size=(users, factors)).astype(np.float32),
+        'item_factors': random.normal(scale=0.1, size=(items, factors)).astype(np.float32),
+    }
+
+
+def exact_user_factors(user_items, item_factors, user):
+    item_factors = item_factors.astype(np.float64)
+    start, end = user_items.indptr[user], user_items.indptr[user + 1]
+    rated = item_factors[user_items.indices[start:end]]
+    confidence = user_items.data[start:end].astype(np.float64)
+
+    a = item_factors.T.dot(item_factors) + REGULARIZATION * np.eye(item_factors.shape[1])
+    a += (rated.T * (confidence - 1)).dot(rated)
+
+    return np.linalg.solve(a, rated.T.dot(confidence))
+
+
+def test_update_factors_only_moves_touched_rows():
+    previous_model = random_model(users=50, items=30, factors=8)
+    user_items, item_users = build_interaction_matrices(
+        [0, 0, 1, 2, 3, 4, 5],
+        [0, 1, 1, 2, 3, 4, 5],
+        np.full(7, 40.0),
+        50,
+        31
+    )
+    touched_users = np.array([0, 1])
+
+    user_factors, item_factors = update_factors(
+        previous_model,
+        previous_model['user_index'],
+        np.arange(31, dtype=np.int64),
+        user_items,
+        item_users,
+        touched_users,
+        REGULARIZATION,
+        iterations=20
+    )
+
+    untouched_users = np.setdiff1d(np.arange(50), touched_users)
+    untouched_items = np.setdiff1d(np.arange(30), [0, 1])
+    np.testing.assert_array_equal(user_factors[untouched_users], previous_model['user_factors'][untouched_users])
+    np.testing.assert_array_equal(item_factors[untouched_items], previous_model['item_factors'][untouched_items])
+    assert not np.allclose(item_factors[[0, 1]], previous_model['item_factors'][[0, 1]])
+    # Item 30 is new and nobody rated it, so it keeps zero factors.
+    np.testing.assert_array_equal(item_factors[30], np.zeros(8, dtype=np.float32))
+
+    for user in touched_users:
+        np.testing.assert_allclose(
+            user_factors[user],
+            exact_user_factors(user_items, item_factors, user),
+            rtol=1e-2,
+            atol=1e-3
+        )
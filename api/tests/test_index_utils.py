@@ -0,0 +1,61 @@
+from odmantic import ObjectId
+
+from app.api.utils.CursorUtils import keyset_sort, recommendations_filter
+from app.api.utils.IndexUtils import QueryShape, resolver_query_shapes, unindexed_queries
+from app.database.models.ModelIndexes import MODEL_INDEXES
+from app.database.models.Recommendation import Recommendation
+
+
+def equality_fields(query_filter: dict) -> set:
+    return {key for key, value in query_filter.items() if not key.startswith('$') and not isinstance(value, dict)}
+
+
+def index_serves_sort(keys, equalities: set, sort) -> bool:
+    fields = [field for field, _ in keys]
+    prefix = [field for field in fields if field in equalities][:len(equalities)]
+    if set(fields[:len(prefix)]) != equalities:
+        return False
+    # Sort fields that are also equality matches are constant and can be skipped.
+    remaining = [field for field, _ in sort if field not in equalities]
+    return fields[len(prefix):len(prefix) + len(remaining)] == remaining
+
+
+def test_unindexed_queries_flags_scans_and_unbounded_sorts():
+    shapes = {
+        'scan': QueryShape(Recommendation, {}, None),
+        'sorted': QueryShape(Recommendation, {}, [('score', 1)]),
+        'bounded_sort': QueryShape(Recommendation, {}, [('score', 1)], True),
+        'indexed': QueryShape(Recommendation, {}, [('score', 1)]),
+    }
+    plans = {
+        'scan': ['LIMIT', 'COLLSCAN'],
+        'sorted': ['LIMIT', 'SORT', 'FETCH', 'IXSCAN'],
+        'bounded_sort': ['SORT', 'FETCH', 'IXSCAN'],
+        'indexed': ['LIMIT', 'FETCH', 'IXSCAN'],
+    }
+
+    assert unindexed_queries(shapes, plans) == ['scan', 'sorted']
+
+
+def test_resolver_query_shapes_use_resolver_filters_and_keyset_pages():
+    project_id = ObjectId()
+    shapes = resolver_query_shapes(project_id)
+
+    first_page = shapes['recommendations item=True stars=True search=False order=-score after=False']
+    assert first_page.query_filter == recommendations_filter(project_id, 0, 5)
+    assert first_page.sort == keyset_sort('score', -1)
+
+    next_page = shapes['recommendations item=True stars=True search=False order=-score after=True']
+    assert next_page.query_filter['$and'][0] == recommendations_filter(project_id, 0, 5)
+    assert next_page.sort == keyset_sort('score', -1)
+
+
+def test_unbounded_shapes_have_an_index_for_their_sort():
+    recommendation_indexes = [index.keys for index in MODEL_INDEXES if index.model is Recommendation]
+
+    for name, shape in resolver_query_shapes(ObjectId()).items():
+        if shape.model is not Recommendation or shape.bounded or shape.sort is None:
+            continue
+        equalities = equality_fields(shape.query_filter if '$and' not in shape.query_filter
+                                     else shape.query_filter['$and'][0])
+        assert any(index_serves_sort(keys, equalities, shape.sort) for keys in recommendation_indexes), name
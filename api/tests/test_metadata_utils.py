@@ -0,0 +1,57 @@
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.api.utils.CsvUtils import read_metadata_csv
+from app.api.utils.MetadataUtils import prepare_metadata_chunk, write_metadata_chunk
+
+PROJECT_METADATA = {
+    'meta_id_header': 'id',
+    'meta_name_header': 'title',
+}
+
+
+class BulkWriteResult:
+    def __init__(self, upserted_count):
+        self.upserted_count = upserted_count
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.operations = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations += operations
+        return BulkWriteResult(len(operations))
+
+
+def read_metadata_chunk(tmp_path, text):
+    location = tmp_path / 'metadata.csv'
+    location.write_text(text)
+    chunk = next(read_metadata_csv(str(location), PROJECT_METADATA))
+
+    return prepare_metadata_chunk(chunk, PROJECT_METADATA['meta_id_header'], PROJECT_METADATA['meta_name_header'])
+
+
+def test_missing_metadata_name_is_stored_as_null(tmp_path):
+    chunk = read_metadata_chunk(tmp_path, 'id,title\n1,First\n2,\n2,\n3,3\n')
+
+    assert [(row.meta_id, row.name) for row in chunk.itertuples(index=False)] == [
+        (1, 'First'), (2, None), (3, '3')
+    ]
+
+    collection = RecordingCollection()
+    written = asyncio.run(write_metadata_chunk(collection, 'project', chunk, True))
+
+    assert written == 3
+    assert collection.operations[1] == UpdateOne(
+        {'project': 'project', 'meta_id': 2, 'name': None},
+        {'$setOnInsert': {'name': None}},
+        upsert=True
+    )
+
+
+def test_chunk_with_only_missing_names(tmp_path):
+    chunk = read_metadata_chunk(tmp_path, 'id,title\n1,\n2,\n')
+
+    assert chunk['name'].tolist() == [None, None]
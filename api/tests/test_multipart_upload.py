@@ -0,0 +1,109 @@
+import json
+
+import graphene
+from graphql.execution.executors.asyncio import AsyncioExecutor
+from starlette.testclient import TestClient
+
+from app.CustomGraphqlApp import CustomGraphqlApp, set_operation_path
+from app.api.mutations.ProjectMutations import ReAnalyze
+
+RE_ANALYZE_MUTATION = '''
+    mutation($projectId: String!, $projectMetadata: ProjectMetadataInput!, $subscriptionsFile: Upload,
+             $incremental: Boolean) {
+        reAnalyze(projectId: $projectId, projectMetadata: $projectMetadata,
+                  subscriptionsFile: $subscriptionsFile, incremental: $incremental) {
+            message
+        }
+    }
+'''
+
+PROJECT_METADATA = {
+    'metaFileName': 'metadata.csv',
+    'subscriptionsFileName': 'subscriptions.csv',
+    'metaIdHeader': 'meta_id',
+    'metaNameHeader': 'name',
+    'subscriptionsUserIdHeader': 'user_id',
+    'subscriptionsMetaIdHeader': 'meta_id',
+    'subscriptionsStartFromHeader': 'start_at',
+    'subscriptionsEndAtHeader': 'end_at',
+}
+
+
+class RecordedReAnalyze(graphene.Mutation):
+    Arguments = ReAnalyze.Arguments
+
+    message = graphene.String()
+
+    @staticmethod
+    def mutate(root, info, subscriptions_file=None, incremental=False, **kwargs):
+        return RecordedReAnalyze(message=json.dumps({
+            'filename': subscriptions_file.filename if subscriptions_file is not None else None,
+            'content': subscriptions_file.file.read().decode() if subscriptions_file is not None else None,
+            'incremental': incremental,
+        }))
+
+
+class Query(graphene.ObjectType):
+    ping = graphene.String(default_value='pong')
+
+
+class Mutation(graphene.ObjectType):
+    re_analyze = RecordedReAnalyze.Field()
+
+
+def create_client():
+    schema = graphene.Schema(query=Query, mutation=Mutation)
+    return TestClient(CustomGraphqlApp(schema=schema, executor_class=AsyncioExecutor))
+
+
+def post_re_analyze(client, variables, files_map, files):
+    return client.post('/', data={
+        'operations': json.dumps({'query': RE_ANALYZE_MUTATION, 'variables': variables}),
+        'map': json.dumps(files_map),
+    }, files=files)
+
+
+def test_re_analyze_multipart_with_file_and_incremental():
+    response = post_re_analyze(
+        create_client(),
+        {
+            'projectId': '0' * 24,
+            'projectMetadata': PROJECT_METADATA,
+            'subscriptionsFile': None,
+            'incremental': True,
+        },
+        {'0': ['variables.subscriptionsFile']},
+        {'0': ('subscriptions.csv', b'user_id,meta_id\n1,2\n', 'text/csv')}
+    )
+
+    assert response.status_code == 200, response.text
+    assert json.loads(response.json()['data']['reAnalyze']['message']) == {
+        'filename': 'subscriptions.csv',
+        'content': 'user_id,meta_id\n1,2\n',
+        'incremental': True,
+    }
+
+
+def test_re_analyze_multipart_without_file():
+    response = post_re_analyze(
+        create_client(),
+        {'projectId': '0' * 24, 'projectMetadata': PROJECT_METADATA, 'incremental': False},
+        {},
+        {'unused': ('unused.txt', b'', 'text/plain')}
+    )
+
+    assert response.status_code == 200, response.text
+    assert json.loads(response.json()['data']['reAnalyze']['message']) == {
+        'filename': None,
+        'content': None,
+        'incremental': False,
+    }
+
+
+def test_set_operation_path_fills_list_placeholders():
+    operations = {'variables': {'files': [None, None], 'projectName': 'test'}}
+
+    set_operation_path(operations, 'variables.files.0', 'metadata')
+    set_operation_path(operations, 'variables.files.1', 'subscriptions')
+
+    assert operations == {'variables': {'files': ['metadata', 'subscriptions'], 'projectName': 'test'}}
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import numpy as np
+
+from app.api.utils import RecommendationUtils
+from app.api.utils.RecommendationUtils import ProjectFactorsCache, find_codes, recommend_for_user
+
+
+def test_find_codes_returns_positions_of_known_ids():
+    index = np.array([3, 7, 11], dtype=np.int64)
+
+    assert find_codes(index, [11, 4, 3, 12]).tolist() == [2, 0]
+
+
+def test_find_codes_with_empty_index():
+    codes = find_codes(np.empty(0, dtype=np.int64), [1, 2])
+
+    assert codes.tolist() == []
+    assert codes.dtype == np.int64
+
+
+def test_recommend_for_unknown_user_in_empty_model():
+    factors = {
+        'user_index': np.empty(0, dtype=np.int64),
+        'user_factors': np.empty((0, 2), dtype=np.float32),
+        'item_index': np.array([5, 6], dtype=np.int64),
+        'item_factors': np.ones((2, 2), dtype=np.float32),
+    }
+
+    assert recommend_for_user(factors, 1) is None
+
+
+def test_factors_cache_load_does_not_block_other_projects(monkeypatch):
+    loading = threading.Event()
+    release = threading.Event()
+
+    def load_manifest(project_id):
+        return {'version': 1}
+
+    def load_model(project_id, version):
+        if project_id == 'slow':
+            loading.set()
+            release.wait(5)
+        return {
+            'user_factors': np.ones((1, 2), dtype=np.float32),
+            'item_factors': np.ones((2, 2), dtype=np.float32),
+            'user_index': np.array([1], dtype=np.int64),
+            'item_index': np.array([5, 6], dtype=np.int64),
+        }
+
+    monkeypatch.setattr(RecommendationUtils, 'load_manifest', load_manifest)
+    monkeypatch.setattr(RecommendationUtils, 'load_model', load_model)
+    monkeypatch.setattr(ProjectFactorsCache, '_manifest_mtime', staticmethod(lambda project_id: 1))
+
+    cache = ProjectFactorsCache(max_bytes=2 ** 20)
+    cached = cache.get('fast')
+
+    slow = threading.Thread(target=cache.get, args=('slow',))
+    slow.start()
+    assert loading.wait(5)
+
+    try:
+        started_at = time.perf_counter()
+        assert cache.get('fast') is cached
+        assert time.perf_counter() - started_at < 1
+    finally:
+        release.set()
+        slow.join(5)
+
+    assert cache.get('slow') is not None
+    assert cache.size == 2 * cached['size']